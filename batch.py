@@ -0,0 +1,94 @@
+from concurrent.futures import ProcessPoolExecutor
+from maze import Maze
+import json
+import mazefile
+import os
+import random
+
+# name of the file listing every maze of a batch, one JSON object per line
+MANIFEST = "manifest.jsonl"
+
+
+def job_seeds(seed, count) -> list[int]:
+    """Return the seeds of count mazes, derived from the seed of the batch
+
+    The seed of every maze only depends on seed and its position in the batch,
+    so a batch is reproduced exactly whatever the number of workers.
+    """
+
+    rng = random.Random(seed)
+    return [rng.getrandbits(63) for _ in range(count)]
+
+
+def run(count, num_cols, num_rows, directory, algorithm="backtracker",
+        seed=None, workers=None, solve=False):
+    """Generate count mazes headlessly across a pool of worker processes
+
+    Every maze is saved to its own maze file in directory (see mazefile), and
+    listed in the MANIFEST file of directory as soon as it's done, in the order
+    of the batch. A seed of None picks a random one, the seed of every maze
+    still ends up in the manifest. workers defaults to the number of CPUs,
+    and a single worker runs every job in the current process.
+
+    Yields the manifest entry of every maze, see run_job.
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    jobs = [(index, num_cols, num_rows, algorithm, job_seed, solve, directory)
+            for index, job_seed in enumerate(job_seeds(seed, count))]
+    workers = workers or os.cpu_count() or 1
+    with open(os.path.join(directory, MANIFEST), "w") as manifest:
+        if workers == 1:
+            results = map(run_job, jobs)
+            yield from _write_manifest(results, manifest)
+            return
+        # hand jobs over in chunks so small mazes don't spend more time
+        # travelling between processes than being generated
+        chunksize = max(1, count // (workers * 4))
+        with ProcessPoolExecutor(workers) as executor:
+            results = executor.map(run_job, jobs, chunksize=chunksize)
+            yield from _write_manifest(results, manifest)
+    return
+
+
+def run_job(job) -> dict:
+    """Generate, and solve if asked to, a single maze of a batch, and save it
+
+    job is a tuple (index, num_cols, num_rows, algorithm, seed, solve,
+    directory). The maze uses the "packed" backend without rendering, and its
+    entrance and exit are broken before generating.
+
+    Returns its manifest entry, a dict with its index, file name, size, seed
+    and algorithm, plus the number of Cells of its solution path if solved,
+    0 when there's none.
+    """
+
+    index, num_cols, num_rows, algorithm, seed, solve, directory = job
+    maze = Maze(0, 0, num_rows, num_cols, 1, 1, backend="packed",
+                render=False, seed=seed)
+    maze._break_entrance_and_exit()
+    maze.generate(algorithm)
+    name = f"maze-{index:06d}.maze"
+    mazefile.save(maze, os.path.join(directory, name))
+    entry = {
+        "index": index,
+        "file": name,
+        "num_rows": num_rows,
+        "num_cols": num_cols,
+        "seed": seed,
+        "algorithm": algorithm,
+    }
+    if solve:
+        entry["solution_length"] = len(maze.solve("bfs"))
+    return entry
+
+
+def _write_manifest(results, manifest):
+    """Write every manifest entry of results as a line of manifest, flushing
+    each one so the manifest can be followed while the batch runs, and yield
+    it"""
+
+    for entry in results:
+        manifest.write(json.dumps(entry) + "\n")
+        manifest.flush()
+        yield entry
@@ -0,0 +1,183 @@
+from maze import Maze
+from time import perf_counter
+import os
+import platform
+import subprocess
+import sys
+import tracemalloc
+
+# grid sizes benchmarked by default, every maze being size x size Cells
+SIZES = (15, 50, 200, 500, 1000, 2000)
+# modules whose import time is benchmarked by default
+IMPORTS = ("maze", "main")
+
+
+def create_cells(size, backend):
+    """Benchmark creating the cells of a headless Maze, see Maze._create_cells
+    """
+
+    return lambda: _maze(size, backend)
+
+
+def generate(size, backend):
+    """Benchmark carving a Maze with the backtracker, see Maze._break_walls
+
+    Maze._break_walls_r carves the same Maze, but can't go beyond the
+    recursion limit, so the iterative version is benchmarked.
+    """
+
+    maze = _maze(size, backend)
+    return lambda: maze._break_walls(0, 0)
+
+
+def solve(size, backend):
+    """Benchmark solving a carved Maze with depth-first search, including
+    building its passages index, see Maze.solve"""
+
+    maze = _generated(size, backend)
+    return lambda: maze.solve("dfs")
+
+
+def render(size, backend):
+    """Benchmark drawing every Cell of a carved Maze without a Window, i.e.,
+    creating all of their Lines, see Maze._draw_cell"""
+
+    maze = _generated(size, backend)
+    maze.render = True
+
+    def draw():
+        for i, cells in enumerate(maze._cells):
+            for j, cell in enumerate(cells):
+                maze._draw_cell(cell, i, j)
+
+    return draw
+
+
+CASES = {
+    "create_cells": create_cells,
+    "generate": generate,
+    "solve": solve,
+    "render": render,
+}
+
+
+def run(sizes=SIZES, cases=tuple(CASES), backend="cells", repeat=3,
+        memory=True):
+    """Run the benchmark cases at every size
+
+    Every case sets up a fresh Maze and returns the operation to time, which is
+    run repeat times, keeping the best time. If memory is True, the operation
+    is then run once more under tracemalloc to get its peak memory usage,
+    which isn't done while timing as tracing slows everything down.
+
+    Yields a dict for every case and size, with the case, size, backend and
+    number of Cells, the best time in seconds, the number of operations and
+    Cells per second, and the peak memory in bytes, or None if not measured.
+    """
+
+    for size in sizes:
+        for case in cases:
+            best = None
+            for _ in range(repeat):
+                operation = CASES[case](size, backend)
+                started = perf_counter()
+                operation()
+                elapsed = perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            peak = _peak_memory(CASES[case](size, backend)) if memory else None
+            yield {
+                "case": case,
+                "size": size,
+                "backend": backend,
+                "cells": size * size,
+                "seconds": best,
+                "ops_per_sec": 1 / best if best else None,
+                "cells_per_sec": size * size / best if best else None,
+                "peak_bytes": peak,
+            }
+
+
+def import_times(modules=IMPORTS, repeat=5):
+    """Time importing every module in a fresh Python interpreter
+
+    Starting an interpreter which imports nothing is timed the same way and
+    subtracted, so only the import itself is left. Each one is run repeat
+    times, keeping the best time.
+
+    Yields a dict for every module, with the module, the best time in seconds
+    and the list of the optional heavy modules, i.e., tkinter and numpy, which
+    importing it loaded.
+    """
+
+    baseline = _best_run("pass", repeat)
+    for module in modules:
+        check = f"import sys, {module}; print(' '.join(" \
+            "m for m in ('tkinter', 'numpy') if m in sys.modules))"
+        loaded = _run(check).stdout.split()
+        yield {
+            "module": module,
+            "seconds": max(_best_run(f"import {module}", repeat) - baseline,
+                           0.0),
+            "loaded": loaded,
+        }
+
+
+def environment() -> dict:
+    """Describe where the benchmarks run, to tell results apart"""
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def _maze(size, backend) -> Maze:
+    """Create a headless Maze of size x size Cells with a fixed seed"""
+
+    return Maze(0, 0, size, size, 1, 1, backend=backend, render=False, seed=0)
+
+
+def _generated(size, backend) -> Maze:
+    """Create a headless Maze of size x size Cells and carve it"""
+
+    maze = _maze(size, backend)
+    maze._break_entrance_and_exit()
+    maze._break_walls(0, 0)
+    return maze
+
+
+def _run(code) -> subprocess.CompletedProcess:
+    """Run code in a fresh Python interpreter able to import the maze modules
+    """
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        filter(None, (directory, os.environ.get("PYTHONPATH")))))
+    return subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                          capture_output=True, text=True)
+
+
+def _best_run(code, repeat) -> float:
+    """Return the best time of running code in a fresh Python interpreter"""
+
+    best = None
+    for _ in range(repeat):
+        started = perf_counter()
+        _run(code)
+        elapsed = perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _peak_memory(operation) -> int:
+    """Run operation under tracemalloc and return its peak memory usage in
+    bytes"""
+
+    tracemalloc.start()
+    try:
+        operation()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
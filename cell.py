@@ -1,4 +1,17 @@
 from graphics import Line, Point
+from operator import attrgetter
+
+
+def _wall(slot):
+    """Return the property of a Cell wall stored in slot, which counts every
+    write in the version of the grid.CellGrid holding the Cell, if any"""
+
+    def set_wall(self, value):
+        setattr(self, slot, value)
+        if self._grid is not None:
+            self._grid.version += 1
+
+    return property(attrgetter(slot), set_wall)
 
 
 class Cell:
@@ -31,9 +44,26 @@ class Cell:
         y coordinate of bottom-right corner.
     _win : graphics.Window
         Instance of graphics.Window class on which Cell Lines are drawn
+    _line_ids : list[int] | None
+        canvas item ids of left, top, right and bottom Lines once drawn on
+        _win, so redrawing the Cell recolors them instead of adding new ones.
+    _grid : grid.CellGrid | None
+        grid holding the Cell, whose version is bumped on every wall change.
     """
 
-    def __init__(self, win=None) -> None:
+    __slots__ = (
+        "_has_left_wall", "_has_top_wall", "_has_right_wall",
+        "_has_bottom_wall", "_grid", "visited", "_x1", "_y1", "_x2", "_y2", "_win",
+        "_line_ids", "left_line", "top_line", "right_line", "bottom_line",
+        "left_fill_color", "top_fill_color", "right_fill_color",
+        "bottom_fill_color", "move_color")
+
+    has_left_wall = _wall("_has_left_wall")
+    has_top_wall = _wall("_has_top_wall")
+    has_right_wall = _wall("_has_right_wall")
+    has_bottom_wall = _wall("_has_bottom_wall")
+
+    def __init__(self, win=None, grid=None) -> None:
         """Instantiates the Cell class
 
         Default:
@@ -44,34 +74,40 @@ class Cell:
         Optional:
         - Use the passed Window instance else None
         (None Window instance is used in testing)
+        - Count wall changes in the version of the passed grid.CellGrid
         """
 
-        self.has_left_wall = True
-        self.has_right_wall = True
-        self.has_top_wall = True
-        self.has_bottom_wall = True
+        self._has_left_wall = True
+        self._has_right_wall = True
+        self._has_top_wall = True
+        self._has_bottom_wall = True
+        self._grid = grid
         self.visited = False
         self._x1 = None
         self._y1 = None
         self._x2 = None
         self._y2 = None
         self._win = win
+        self._line_ids = None
         return
 
-    def draw(self, x1, y1, x2, y2, fill_color="black") -> bool:
+    def draw(self, x1, y1, x2, y2, fill_color="black", geometry=None) -> bool:
         """Draw the Cell instance onto graphics.Window canvas
 
         - If any of the corner coordinates are None, return False stating that
         the cell wasn't drawn.
         - Else,
-            - Create all four Cell wall Lines.
+            - Create all four Cell wall Lines, or get them from the
+              graphics.SharedGeometry passed as geometry, so walls and corners
+              shared with neighbouring Cells aren't created again.
             - Set the bg_color to use the passed background color or "white".
             ("white" is default background color)
             - Set the Cell wall Line colors to either:
                 - Same as bg_color (When the wall shouldn't exist).
                 - Passed fill_color else default fill_color, i.e, "black".
             - Draw the walls using graphics.Window.draw_line if Window instance
-              exists.
+              exists, or only recolor them with graphics.Window.recolor_line if
+              they were already drawn at the same coordinates.
             - return True stating the Cell walls were created, and perhaps drawn
               if possible.
         """
@@ -80,15 +116,26 @@ class Cell:
                 x2 is None or y2 is None:
             return False
 
+        moved = (x1, y1, x2, y2) != (self._x1, self._y1, self._x2, self._y2)
         self._x1 = x1
         self._y1 = y1
         self._x2 = x2
         self._y2 = y2
 
-        self.left_line = Line(Point(x1, y1), Point(x1, y2))
-        self.top_line = Line(Point(x1, y1), Point(x2, y1))
-        self.right_line = Line(Point(x2, y1), Point(x2, y2))
-        self.bottom_line = Line(Point(x1, y2), Point(x2, y2))
+        if geometry is None:
+            self.left_line = Line(Point(x1, y1), Point(x1, y2))
+            self.top_line = Line(Point(x1, y1), Point(x2, y1))
+            self.right_line = Line(Point(x2, y1), Point(x2, y2))
+            self.bottom_line = Line(Point(x1, y2), Point(x2, y2))
+        else:
+            top_left = geometry.point(x1, y1)
+            top_right = geometry.point(x2, y1)
+            bottom_left = geometry.point(x1, y2)
+            bottom_right = geometry.point(x2, y2)
+            self.left_line = geometry.line(top_left, bottom_left)
+            self.top_line = geometry.line(top_left, top_right)
+            self.right_line = geometry.line(top_right, bottom_right)
+            self.bottom_line = geometry.line(bottom_left, bottom_right)
 
         # hard-coded background color as white for tests
         bg_color = self._win.background if self._win else "white"
@@ -99,10 +146,16 @@ class Cell:
         self.bottom_fill_color = fill_color if self.has_bottom_wall else bg_color
 
         if self._win:
-            self._win.draw_line(self.left_line, self.left_fill_color)
-            self._win.draw_line(self.top_line, self.top_fill_color)
-            self._win.draw_line(self.right_line, self.right_fill_color)
-            self._win.draw_line(self.bottom_line, self.bottom_fill_color)
+            fill_colors = (self.left_fill_color, self.top_fill_color,
+                           self.right_fill_color, self.bottom_fill_color)
+            if self._line_ids is None or moved:
+                lines = (self.left_line, self.top_line,
+                         self.right_line, self.bottom_line)
+                self._line_ids = [self._win.draw_line(line, color)
+                                  for line, color in zip(lines, fill_colors)]
+            else:
+                for item, color in zip(self._line_ids, fill_colors):
+                    self._win.recolor_line(item, color)
 
         return True
 
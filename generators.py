@@ -0,0 +1,288 @@
+import random
+
+# Every generator takes the Maze to carve and the random number generator to
+# use, and yields ("carve", i, j, to_i, to_j) right after breaking the wall
+# between Cells at (i, j) and (to_i, to_j) with Maze._break_wall_between, just
+# like Maze.iter_break_walls. Apart from "backtracker", they all carve a perfect
+# maze over the whole grid, i.e., every Cell is reachable from every other Cell
+# through exactly one path.
+
+
+def backtracker(maze, rng=random):
+    """Carve with the recursive backtracker, see Maze.iter_break_walls
+
+    This stops as soon as the last Cell of the Maze is reached, so Cells which
+    weren't reached by then keep all of their walls.
+    """
+
+    yield from maze.iter_break_walls(0, 0, rng)
+
+
+def kruskal(maze, rng=random):
+    """Carve with randomized Kruskal's algorithm
+
+    Every wall between two Cells is visited once in random order, and broken
+    if the Cells on both sides aren't connected yet, which is tracked with a
+    union-find structure over the Cells.
+    """
+
+    num_cols, num_rows = maze.num_cols, maze.num_rows
+    walls = [(i, j, i + 1, j)
+             for j in range(num_rows) for i in range(num_cols - 1)]
+    walls += [(i, j, i, j + 1)
+              for j in range(num_rows - 1) for i in range(num_cols)]
+    rng.shuffle(walls)
+    sets = _UnionFind(num_cols * num_rows)
+    for i, j, to_i, to_j in walls:
+        if sets.union(j * num_cols + i, to_j * num_cols + to_i):
+            maze._break_wall_between(i, j, to_i, to_j)
+            yield ("carve", i, j, to_i, to_j)
+
+
+def prim(maze, rng=random):
+    """Carve with randomized Prim's algorithm
+
+    Starting from a random Cell, a random Cell of the frontier, i.e., Cells
+    next to the carved part of the Maze, is connected to a random carved
+    neighbour until the frontier is empty.
+    """
+
+    num_cols, num_rows = maze.num_cols, maze.num_rows
+    # 0 when not reached yet, 1 when on the frontier, 2 when carved
+    state = bytearray(num_cols * num_rows)
+    frontier = []
+
+    def carve(i, j):
+        state[j * num_cols + i] = 2
+        for n_i, n_j in _neighbours(i, j, num_cols, num_rows):
+            if state[n_j * num_cols + n_i] == 0:
+                state[n_j * num_cols + n_i] = 1
+                frontier.append((n_i, n_j))
+
+    carve(rng.randrange(num_cols), rng.randrange(num_rows))
+    while frontier:
+        # swap the chosen Cell with the last one to pop it in O(1)
+        ix = rng.randrange(len(frontier))
+        frontier[ix], frontier[-1] = frontier[-1], frontier[ix]
+        i, j = frontier.pop()
+        to_i, to_j = rng.choice([
+            (n_i, n_j) for n_i, n_j in _neighbours(i, j, num_cols, num_rows)
+            if state[n_j * num_cols + n_i] == 2])
+        maze._break_wall_between(i, j, to_i, to_j)
+        carve(i, j)
+        yield ("carve", i, j, to_i, to_j)
+
+
+def wilson(maze, rng=random):
+    """Carve with Wilson's algorithm
+
+    Starting with a single random Cell in the Maze, every Cell not in the Maze
+    yet starts a random walk which ends on reaching the Maze. The walk is then
+    carved without any of its loops, which makes every perfect maze equally
+    likely.
+    """
+
+    num_cols, num_rows = maze.num_cols, maze.num_rows
+    in_maze = bytearray(num_cols * num_rows)
+    in_maze[rng.randrange(num_cols * num_rows)] = 1
+    # last direction taken out of every Cell of the current walk, later moves
+    # overwrite earlier ones, which erases the loops
+    exits = {}
+    for start in range(num_cols * num_rows):
+        if in_maze[start]:
+            continue
+        i, j = start % num_cols, start // num_cols
+        while not in_maze[j * num_cols + i]:
+            to_i, to_j = rng.choice(_neighbours(i, j, num_cols, num_rows))
+            exits[(i, j)] = (to_i, to_j)
+            i, j = to_i, to_j
+        i, j = start % num_cols, start // num_cols
+        while not in_maze[j * num_cols + i]:
+            in_maze[j * num_cols + i] = 1
+            to_i, to_j = exits[(i, j)]
+            maze._break_wall_between(i, j, to_i, to_j)
+            yield ("carve", i, j, to_i, to_j)
+            i, j = to_i, to_j
+        exits.clear()
+
+
+def eller(maze, rng=random):
+    """Carve with Eller's algorithm, row after row, see eller_rows"""
+
+    for j, (right, down) in enumerate(
+            eller_rows(maze.num_cols, maze.num_rows, rng)):
+        for i, carved in enumerate(right):
+            if carved:
+                maze._break_wall_between(i, j, i + 1, j)
+                yield ("carve", i, j, i + 1, j)
+        for i, carved in enumerate(down):
+            if carved:
+                maze._break_wall_between(i, j, i, j + 1)
+                yield ("carve", i, j, i, j + 1)
+
+
+def eller_rows(num_cols, num_rows, rng=random):
+    """Generate a perfect maze row after row with Eller's algorithm
+
+    This only keeps track of which set, i.e., group of connected Cells, every
+    Cell of the current row belongs to, so memory only depends on num_cols and
+    num_rows can be as large as needed.
+
+    For every row:
+    - Randomly join adjacent Cells which belong to different sets, always
+      joining them on the last row so everything ends up connected
+    - Unless it's the last row, randomly carve down from the Cells of every
+      set, at-least once per set so none of them is cut off. Cells of the next
+      row which weren't carved into start a set of their own
+
+    Yields a tuple of lists (right, down) for every row, right[i] being True if
+    the wall between Cells i and i + 1 of the row is broken and down[i] being
+    True if the wall between Cell i and the Cell below it is broken.
+    """
+
+    labels = list(range(num_cols))
+    members = {i: [i] for i in range(num_cols)}
+    next_label = num_cols
+    for j in range(num_rows):
+        last_row = j == num_rows - 1
+        right = [False] * (num_cols - 1)
+        for i in range(num_cols - 1):
+            a, b = labels[i], labels[i + 1]
+            if a != b and (last_row or rng.random() < 0.5):
+                right[i] = True
+                # relabel the smaller set so joining stays cheap
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for c in members[b]:
+                    labels[c] = a
+                members[a] += members.pop(b)
+        down = [False] * num_cols
+        if not last_row:
+            for cols in members.values():
+                chosen = [c for c in cols if rng.random() < 0.5]
+                for c in chosen or [rng.choice(cols)]:
+                    down[c] = True
+            members = {}
+            for i in range(num_cols):
+                if not down[i]:
+                    labels[i] = next_label
+                    next_label += 1
+                members.setdefault(labels[i], []).append(i)
+        yield right, down
+
+
+def binary_tree(maze, rng=random):
+    """Carve with the binary tree algorithm in a single pass
+
+    Every Cell breaks either its top or its left wall at random, or the only
+    one of them it can break on the first row and column.
+    """
+
+    for j in range(maze.num_rows):
+        for i in range(maze.num_cols):
+            if i == 0 and j == 0:
+                continue
+            if j == 0 or (i != 0 and rng.random() < 0.5):
+                to_i, to_j = i - 1, j
+            else:
+                to_i, to_j = i, j - 1
+            maze._break_wall_between(i, j, to_i, to_j)
+            yield ("carve", i, j, to_i, to_j)
+
+
+def sidewinder(maze, rng=random):
+    """Carve with the sidewinder algorithm in a single pass, see
+    sidewinder_rows"""
+
+    for j, (right, up) in enumerate(
+            sidewinder_rows(maze.num_cols, maze.num_rows, rng)):
+        for i, carved in enumerate(right):
+            if carved:
+                maze._break_wall_between(i, j, i + 1, j)
+                yield ("carve", i, j, i + 1, j)
+        for i, carved in enumerate(up):
+            if carved:
+                maze._break_wall_between(i, j, i, j - 1)
+                yield ("carve", i, j, i, j - 1)
+
+
+def sidewinder_rows(num_cols, num_rows, rng=random):
+    """Generate a perfect maze row after row with the sidewinder algorithm
+
+    The first row is a single corridor. On every other row, Cells are joined
+    into runs going right which randomly end, and every run then breaks the top
+    wall of one of its Cells at random. Nothing but the current row is kept,
+    so memory only depends on num_cols.
+
+    Yields a tuple of lists (right, up) for every row, right[i] being True if
+    the wall between Cells i and i + 1 of the row is broken and up[i] being
+    True if the wall between Cell i and the Cell above it is broken.
+    """
+
+    for j in range(num_rows):
+        right = [False] * (num_cols - 1)
+        up = [False] * num_cols
+        run_start = 0
+        for i in range(num_cols):
+            if j != 0 and (i == num_cols - 1 or rng.random() < 0.5):
+                up[rng.randrange(run_start, i + 1)] = True
+                run_start = i + 1
+            elif i != num_cols - 1:
+                right[i] = True
+        yield right, up
+
+
+ALGORITHMS = {
+    "backtracker": backtracker,
+    "kruskal": kruskal,
+    "prim": prim,
+    "wilson": wilson,
+    "eller": eller,
+    "binary-tree": binary_tree,
+    "sidewinder": sidewinder,
+}
+
+
+def _neighbours(i, j, num_cols, num_rows) -> list:
+    """Return the list of Cells next to Cell at (i, j) within the grid"""
+
+    neighbours = []
+    if i != 0:
+        neighbours.append((i - 1, j))
+    if j != 0:
+        neighbours.append((i, j - 1))
+    if i < num_cols - 1:
+        neighbours.append((i + 1, j))
+    if j < num_rows - 1:
+        neighbours.append((i, j + 1))
+    return neighbours
+
+
+class _UnionFind():
+    """Disjoint sets of the integers 0 to size - 1 with path halving and union
+    by size"""
+
+    def __init__(self, size) -> None:
+        self._parents = list(range(size))
+        self._sizes = [1] * size
+        return
+
+    def find(self, x) -> int:
+        parents = self._parents
+        while parents[x] != x:
+            parents[x] = parents[parents[x]]
+            x = parents[x]
+        return x
+
+    def union(self, x, y) -> bool:
+        """Join the sets of x and y, returning False if they already were the
+        same set"""
+
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+        if self._sizes[x] < self._sizes[y]:
+            x, y = y, x
+        self._parents[y] = x
+        self._sizes[x] += self._sizes[y]
+        return True
@@ -0,0 +1,188 @@
+from collections import ChainMap
+from itertools import compress
+import copy
+
+# whether a Cell with the given passages byte of Maze._passages is a node of a
+# JunctionGraph, i.e., it has one, three or four open passages
+_IS_NODE = bytes(int(bin(passages).count("1") in (1, 3, 4))
+                 for passages in range(256))
+
+
+class JunctionGraph():
+    """Graph of the junctions of a Maze, where corridors are single edges
+
+    Corridor Cells, i.e., Cells with exactly two open passages, are never
+    nodes: every run of them between two other Cells is compressed into a
+    single edge weighted by its number of moves. Nodes are junctions and dead
+    ends, plus any extra Cells asked for, e.g., the start and goal of a
+    search. Closed off Cells, which can't be reached, are left out.
+
+    Nodes are Cell indices, the Cell at (i, j) being at j * num_cols + i like
+    in Maze._passages. Corridors aren't stored, they're walked again from the
+    passages when expanding a path, so the graph only takes memory for its
+    nodes and edges. Corridors going round in a loop back to the node they
+    started from are left out, as no shortest path takes them.
+
+    Attributes
+    ----------
+    edges : dict[int, list[tuple[int, int, int]]] | collections.ChainMap
+        edges out of every node, as (to_node, length, via) with the number of
+        moves to to_node, and the first Cell after the node on the way there.
+        A ChainMap over the edges of the original graph for a graph returned
+        by JunctionGraph.spliced.
+    _passages : bytearray
+        open passages out of every Cell, see Maze._passages.
+    _moves : list[tuple[int, ...]]
+        Cell index offsets of the moves allowed by every passages byte, see
+        Maze._moves.
+    _is_node : bytearray
+        1 for every Cell which is a node, else 0, not counting the nodes
+        spliced in by JunctionGraph.spliced.
+    """
+
+    def __init__(self, passages, moves, extra=()) -> None:
+        """Instantiates the JunctionGraph of the Maze with the given passages
+        and moves, with every Cell index of extra as a node too"""
+
+        self._passages = passages
+        self._moves = moves
+        self._is_node = bytearray(passages.translate(_IS_NODE))
+        for node in extra:
+            self._is_node[node] = 1
+        self.edges = {}
+        self._build()
+        return
+
+    def _build(self) -> None:
+        """Walk every corridor once, adding its edge to the nodes at both of
+        its ends"""
+
+        passages, moves, is_node = self._passages, self._moves, self._is_node
+        edges = self.edges = {node: [] for node in compress(
+            range(len(is_node)), is_node)}
+        # (node, via) of the corridors already walked from their other end
+        walked = set()
+        for node, node_edges in edges.items():
+            for offset in moves[passages[node]]:
+                via = node + offset
+                if is_node[via]:
+                    # nodes next to each other, added by the first one
+                    if via > node:
+                        node_edges.append((via, 1, via))
+                        edges[via].append((node, 1, node))
+                    continue
+                if (node, via) in walked:
+                    continue
+                end, length, last = self._walk(node, via)
+                if end == node:
+                    walked.add((node, last))
+                    continue
+                node_edges.append((end, length, via))
+                edges[end].append((node, length, last))
+                walked.add((end, last))
+        return
+
+    def _walk(self, node, via) -> tuple[int, int, int]:
+        """Follow the corridor leaving node through via up to the next node
+
+        Returns (end, length, last) with the node at the end of the corridor,
+        its number of moves, and its last Cell before end, which is node for
+        a corridor of a single move.
+        """
+
+        passages, moves, is_node = self._passages, self._moves, self._is_node
+        previous, index, length = node, via, 1
+        while not is_node[index]:
+            step, other = moves[passages[index]]
+            if index + step == previous:
+                step = other
+            previous, index = index, index + step
+            length += 1
+        return index, length, previous
+
+    def spliced(self, cells) -> "JunctionGraph":
+        """Return a copy of the graph where every Cell index of cells is a node
+        too
+
+        A Cell in the middle of a corridor becomes a node with edges to the
+        nodes at both ends of the corridor, which keep their edge to each
+        other. The copy shares everything else with the graph, which is left
+        untouched, so splicing takes time proportional to the length of the
+        corridors of cells rather than the size of the graph.
+        """
+
+        passages, moves, is_node = self._passages, self._moves, self._is_node
+        graph = copy.copy(self)
+        # edge lists of new nodes and copies of the ones getting new edges
+        added = {}
+        graph.edges = edges = ChainMap(added, self.edges)
+        for cell in cells:
+            if cell in edges:
+                continue
+            added[cell] = []
+            for offset in moves[passages[cell]]:
+                previous, index, length = cell, cell + offset, 1
+                while not is_node[index] and index not in added:
+                    step, other = moves[passages[index]]
+                    if index + step == previous:
+                        step = other
+                    previous, index = index, index + step
+                    length += 1
+                if index == cell:
+                    continue
+                if index not in added:
+                    added[index] = list(edges[index])
+                added[cell].append((index, length, cell + offset))
+                added[index].append((cell, length, previous))
+        return graph
+
+    def edge_list(self) -> list[tuple[int, int, int]]:
+        """Return every edge once, as (node, to_node, length) with node lower
+        than to_node"""
+
+        return [(node, to_node, length)
+                for node, node_edges in self.edges.items()
+                for to_node, length, _ in node_edges if node < to_node]
+
+    def to_dict(self) -> dict:
+        """Return the nodes and edges of the graph as a dict which can be
+        dumped as JSON, i.e., {"nodes": [node, ...], "edges": [[node, to_node,
+        length], ...]} with the edges of JunctionGraph.edge_list"""
+
+        return {
+            "nodes": sorted(self.edges),
+            "edges": [list(edge) for edge in self.edge_list()],
+        }
+
+    def neighbours(self, node) -> list[tuple[int, int]]:
+        """Return the nodes one edge away from node, as (to_node, length)"""
+
+        return [(to_node, length) for to_node, length, _ in self.edges[node]]
+
+    def expand(self, nodes) -> list[int]:
+        """Expand a path of nodes into the path of every Cell along the way,
+        taking the shortest edge between consecutive nodes"""
+
+        if not nodes:
+            return []
+        passages, moves = self._passages, self._moves
+        path = [nodes[0]]
+        for node, to_node in zip(nodes, nodes[1:]):
+            _, via = min((length, via) for end, length, via in
+                         self.edges[node] if end == to_node)
+            previous, index = node, via
+            while index != to_node:
+                path.append(index)
+                step, other = moves[passages[index]]
+                if index + step == previous:
+                    step = other
+                previous, index = index, index + step
+            path.append(to_node)
+        return path
+
+    def expanded(self, search):
+        """Yield the events of a solvers search over the graph, and return its
+        solution path expanded with JunctionGraph.expand"""
+
+        nodes = yield from search
+        return self.expand(nodes)
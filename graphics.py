@@ -1,4 +1,12 @@
-from tkinter import Tk, BOTH, Canvas
+from time import monotonic, sleep
+
+# scale applied to the animation delays requested by the Maze for each speed
+SPEEDS = {
+    "slow": 1.0,
+    "normal": 0.25,
+    "fast": 0.05,
+    "instant": 0.0,
+}
 
 
 class Window():
@@ -17,12 +25,36 @@ class Window():
         Canvas object packed onto the Window object
     __is_running : bool
         Determines weather the Window object is open or exited
+    __frames : graphics.FrameScheduler
+        Coalesces the redraws requested through Window.animate into frames
+    __wake : tkinter.BooleanVar
+        Set by the Tk event loop to end a Window.wait
+    __wake_id : str | None
+        Id of the pending tkinter "after" callback setting __wake
+    __play_id : str | None
+        Id of the pending tkinter "after" callback of Window.play
+    __stats : stats.MazeStats | None
+        Counts canvas items and times waits and work, if instrumented
     """
 
-    def __init__(self, height, width, background="white") -> None:
+    def __init__(self, height, width, background="white", speed="normal",
+                 fps=60, ops_per_frame=None, stats=None) -> None:
         """Instantiates the Window class object with a canvas as per passed
         height, width and the background color is provided else defaults to
-        "white" color."""
+        "white" color.
+
+        speed is one of the SPEEDS and scales the delays of Window.animate,
+        whereas fps and ops_per_frame set how often the canvas is redrawn (see
+        graphics.FrameScheduler).
+
+        Passing a stats.MazeStats as stats counts the canvas items created and
+        times the waits and the work done in between frames.
+
+        tkinter is only imported here, so everything else, e.g., headless
+        mazes, works without Tk installed and doesn't pay for importing it.
+        """
+
+        from tkinter import Tk, BOTH, BooleanVar, Canvas
 
         self.__root = Tk()
         self.__root.attributes('-type', 'dialog')
@@ -35,39 +67,246 @@ class Window():
             height=height,
             width=width)
         self.__canvas.pack(fill=BOTH, expand=1)
-        self.__is_running = False
+        self.__is_running = True
+        self.__wake = BooleanVar(self.__root)
+        self.__wake_id = None
+        self.__play_id = None
+        self.__stats = stats
+        self.__frames = FrameScheduler(
+            self.redraw, SPEEDS[speed], fps, ops_per_frame, self.wait)
         return
 
     def redraw(self) -> None:
         """Redraws the Window object"""
 
-        self.__root.update_idletasks()
-        # self.__root.update()
+        if self.__is_running:
+            self.__root.update_idletasks()
         return
 
-    def wait_for_close(self) -> None:
-        """This sets the default behaviour of Window object to be running and
-        is called by the driver code where the Window object is instantiated"""
+    def wait(self, seconds) -> None:
+        """Wait for the given number of seconds without blocking the Window
 
-        self.__is_running = True
-        while self.__is_running:
-            self.redraw()
+        Rather than sleeping, this schedules a callback with tkinter "after"
+        and runs the Tk event loop until it fires, so the Window keeps
+        repainting and responding, e.g., to being closed, in the meantime.
+        """
+
+        if not self.__is_running:
+            return
+        self.__wake_id = self.__root.after(
+            int(seconds * 1000), self.__wake.set, True)
+        if self.__stats is None:
+            self.__root.wait_variable(self.__wake)
+        else:
+            with self.__stats.timer("wait"):
+                self.__root.wait_variable(self.__wake)
+        self.__wake_id = None
+        return
+
+    def animate(self, delay=0.0) -> None:
+        """Mark one drawing operation as done, which should be shown for delay
+        seconds before the next one at "slow" speed
+
+        Operations are coalesced by the FrameScheduler, so the canvas is only
+        redrawn once per frame rather than after every operation.
+        """
+
+        if self.__play_id is not None:
+            # Window.play draws the frames in between its steps
+            self.__frames.add(delay)
+        else:
+            self.__frames.tick(delay)
+        return
+
+    def play(self, events, handler) -> None:
+        """Feed events to handler as scheduled steps of the Tk event loop
+
+        events is any iterable, e.g., a generator of Maze.iter_break_walls or
+        Maze.iter_solve events, and handler is invoked with each one in turn,
+        typically to draw it. Rather than blocking, every step handles events
+        until a frame is due, draws that frame and schedules the next step with
+        tkinter "after" for when the frame has been shown long enough. When
+        handling events can't keep up with the frame rate, frames are dropped,
+        i.e., more events are coalesced into each frame.
+
+        Nothing happens until the Tk event loop runs, e.g., within
+        Window.wait_for_close, and nothing at all once the Window is closed.
+        """
+
+        if not self.__is_running:
+            return
+        events = iter(events)
+
+        def handle() -> bool:
+            for event in events:
+                handler(event)
+                if self.__frames.is_due():
+                    return True
+            return False
+
+        def step():
+            if self.__stats is None:
+                more = handle()
+            else:
+                with self.__stats.timer("work"):
+                    more = handle()
+            if not more or not self.__is_running:
+                # done, or the Window was closed while handling events
+                self.__play_id = None
+                self.__frames.frame()
+                return
+            remaining = self.__frames.frame()
+            self.__play_id = self.__root.after(int(remaining * 1000), step)
+
+        self.__play_id = self.__root.after_idle(step)
+        return
+
+    def wait_for_close(self) -> None:
+        """This is called by the driver code where the Window object is
+        instantiated once it's done drawing, and hands over to the Tk event
+        loop, which sleeps until there is an event to handle, until the Window
+        object is closed"""
+
+        self.__frames.flush()
+        if self.__is_running:
+            self.__root.mainloop()
         return
 
-    def draw_line(self, line, fill_color="black") -> None:
+    def draw_line(self, line, fill_color="black") -> int | None:
         """This draw the line which is an instance of graphics.Line class using
-        the canvas with the default color as "black" unless specified"""
+        the canvas with the default color as "black" unless specified
+
+        Returns the id of the canvas item created for the line, which can be
+        passed to Window.recolor_line later on.
+        """
+
+        if line and self.__is_running:
+            if self.__stats is not None:
+                self.__stats.count("canvas_items")
+            return line.draw(self.__canvas, fill_color)
+        return None
+
+    def recolor_line(self, item, fill_color="black") -> None:
+        """This changes the color of a line previously drawn with
+        Window.draw_line, given its canvas item id, instead of drawing a new
+        line on top of it"""
 
-        if line:
-            line.draw(self.__canvas, fill_color)
+        if item is not None and self.__is_running:
+            self.__canvas.itemconfig(item, fill=fill_color)
         return
 
     def close(self) -> None:
         """This is invoked in a protocol bound to Window object when it's
-        closed marking the running behaviour to False, hence "wait_for_close"
-        will return the control back to driver code"""
+        closed marking the running behaviour to False and destroying the Tk
+        window, hence "wait_for_close" will return the control back to driver
+        code
 
+        Any pending Window.wait is released, and drawing on a closed Window
+        does nothing, so an animation which is still running simply finishes
+        without showing anything.
+        """
+
+        if not self.__is_running:
+            return
         self.__is_running = False
+        if self.__play_id is not None:
+            self.__root.after_cancel(self.__play_id)
+        if self.__wake_id is not None:
+            self.__root.after_cancel(self.__wake_id)
+            self.__wake.set(True)
+        self.__root.destroy()
+        return
+
+
+class FrameScheduler():
+    """Frame scheduler to batch redraws of a Window
+
+    Every drawing operation is reported with FrameScheduler.tick along with the
+    delay it should be shown for. Operations are accumulated until a frame is
+    due, which then redraws once and waits for whatever part of the
+    accumulated delay hasn't already been spent drawing.
+
+    A frame is due when either:
+    - the accumulated delay reaches the frame interval
+    - the frame interval has elapsed since the last frame, so the display keeps
+      up even when nothing asks to wait, e.g., at "instant" speed
+    - ops_per_frame operations were accumulated, if set
+
+    Attributes
+    ----------
+    delay_scale : float
+        multiplier applied to every delay passed to FrameScheduler.tick.
+    frame_interval : float
+        minimum number of seconds between two frames, i.e., 1 / fps.
+    ops_per_frame : int | None
+        maximum number of operations coalesced into a single frame.
+    _redraw : Callable[[], None]
+        redraws the display.
+    _wait : Callable[[float], None]
+        waits for the given number of seconds.
+    """
+
+    def __init__(self, redraw, delay_scale=1.0, fps=60, ops_per_frame=None,
+                 wait=sleep) -> None:
+        """Instantiates the FrameScheduler calling redraw once per frame"""
+
+        self.delay_scale = delay_scale
+        self.frame_interval = 1 / fps
+        self.ops_per_frame = ops_per_frame
+        self._redraw = redraw
+        self._wait = wait
+        self._pending_ops = 0
+        self._pending_delay = 0.0
+        self._last_frame = monotonic()
+        return
+
+    def tick(self, delay=0.0) -> None:
+        """Account for one drawing operation shown for delay seconds, and draw
+        a frame if one is due"""
+
+        self.add(delay)
+        if self.is_due():
+            self.flush()
+        return
+
+    def add(self, delay=0.0) -> None:
+        """Account for one drawing operation shown for delay seconds without
+        drawing a frame"""
+
+        self._pending_ops += 1
+        self._pending_delay += delay * self.delay_scale
+        return
+
+    def is_due(self) -> bool:
+        """Check if a frame is due for the pending operations"""
+
+        return self._pending_delay >= self.frame_interval or\
+            monotonic() - self._last_frame >= self.frame_interval or\
+            bool(self.ops_per_frame and
+                 self._pending_ops >= self.ops_per_frame)
+
+    def frame(self) -> float:
+        """Draw a frame with all pending operations without waiting
+
+        Returns the number of seconds left of their delay, which should pass
+        before the next frame is drawn.
+        """
+
+        self._redraw()
+        remaining = max(
+            self._pending_delay - (monotonic() - self._last_frame), 0.0)
+        self._pending_ops = 0
+        self._pending_delay = 0.0
+        self._last_frame = monotonic() + remaining
+        return remaining
+
+    def flush(self) -> None:
+        """Draw a frame with all pending operations and wait for the rest of
+        their delay"""
+
+        remaining = self.frame()
+        if remaining > 0:
+            self._wait(remaining)
         return
 
 
@@ -75,7 +314,8 @@ class Point():
     """Graphics Point class
 
     This class creates a point analogous to coordinate system point having x and
-    a y coordinate.
+    a y coordinate. Points are hashable so they can be shared, see
+    graphics.SharedGeometry, hence they shouldn't be changed once created.
 
     Attributes
     ----------
@@ -85,6 +325,8 @@ class Point():
         y coordinate of the Point
     """
 
+    __slots__ = ("x", "y")
+
     def __init__(self, x, y) -> None:
         """Instantiates the Point class object setting it's x and y coordinate.
         """
@@ -100,13 +342,18 @@ class Point():
 
         return self.x == t.x and self.y == t.y
 
+    def __hash__(self) -> int:
+        """Returns a hash of the Point object consistent with Point.__eq__"""
+
+        return hash((self.x, self.y))
+
 
 class Line:
     """Graphics Line class
 
     This class creates a line analogous to a line on a coordinate system
     consisting of two points, start and end, which in this case would actual
-    be an instance of graphics.Point class
+    be an instance of graphics.Point class. Lines are hashable like Points.
 
     Attributes
     ----------
@@ -116,6 +363,8 @@ class Line:
         end point of the line
     """
 
+    __slots__ = ("p1", "p2")
+
     def __init__(self, p1, p2) -> None:
         """Instantiates the Line class setting the start and end point."""
 
@@ -129,17 +378,76 @@ class Line:
 
         return self.p1 == t.p1 and self.p2 == t.p2
 
-    def draw(self, canvas, fill_color="black") -> None:
+    def __hash__(self) -> int:
+        """Returns a hash of the Line object consistent with Line.__eq__"""
+
+        return hash((self.p1, self.p2))
+
+    def draw(self, canvas, fill_color="black") -> int:
         """This draws a line using tkinter.canvas.create_line from start point
         to end point with 2 pixels width and line color as "black" unless
         specified in "fill_color"
+
+        Returns the id of the created canvas item.
         """
 
-        canvas.create_line(
+        return canvas.create_line(
             self.p1.x,
             self.p1.y,
             self.p2.x,
             self.p2.y,
             fill=fill_color,
             width=2)
-        canvas.pack(fill=BOTH, expand=1)
+
+
+class SharedGeometry():
+    """Interns Points and Lines, so every distinct one exists once
+
+    Neighbouring Cells of a Maze share corners and walls, so rather than each
+    Cell creating its own Points and Lines, they get them from a common
+    SharedGeometry, which returns the instance it already holds for equal
+    coordinates, and only creates one the first time.
+
+    Attributes
+    ----------
+    _points : dict[int, dict[int, graphics.Point]]
+        every distinct Point created so far, by its x then y coordinates, so
+        looking one up doesn't allocate anything.
+    _lines : dict[tuple[int, int, int, int], graphics.Line]
+        every distinct Line created so far, by the (x, y) coordinates of its
+        p1 then p2 Points.
+    """
+
+    def __init__(self) -> None:
+        """Instantiates the SharedGeometry without any Point or Line"""
+
+        self._points = {}
+        self._lines = {}
+        return
+
+    def point(self, x, y) -> Point:
+        """Return the Point at x, y"""
+
+        column = self._points.get(x)
+        if column is None:
+            column = self._points[x] = {}
+        point = column.get(y)
+        if point is None:
+            point = column[y] = Point(x, y)
+        return point
+
+    def line(self, p1, p2) -> Line:
+        """Return the Line from p1 to p2"""
+
+        key = (p1.x, p1.y, p2.x, p2.y)
+        line = self._lines.get(key)
+        if line is None:
+            line = self._lines[key] = Line(p1, p2)
+        return line
+
+    def clear(self) -> None:
+        """Forget every Point and Line"""
+
+        self._points.clear()
+        self._lines.clear()
+        return
@@ -0,0 +1,503 @@
+from cell import Cell
+
+LEFT = 1
+TOP = 2
+RIGHT = 4
+BOTTOM = 8
+ALL_WALLS = LEFT | TOP | RIGHT | BOTTOM
+VISITED = 16
+
+# byte translation tables dropping the VISITED bit, or keeping only the wall
+# bits, i.e., the low nibble, of every cell at once
+_CLEAR_VISITED = bytes(b & ~VISITED for b in range(256))
+_WALLS_ONLY = bytes(b & ALL_WALLS for b in range(256))
+# byte translation table extracting the high nibble of a byte
+_HIGH_NIBBLE = bytes(b >> 4 for b in range(256))
+# number of bits set in every combination of LEFT, TOP, RIGHT and BOTTOM
+_BIT_COUNTS = [bin(b).count("1") for b in range(16)]
+
+
+class CellGrid(list):
+    """Grid of Cell class instances
+
+    This is the default storage of Maze._cells, i.e., a list of columns where
+    each column is a list of Cell instances, so _cells[i][j] is the Cell in
+    column i and row j. On top of that it provides the same wall and visited
+    accessors as PackedGrid so Maze algorithms work on either of them.
+
+    Attributes
+    ----------
+    version : int
+        counts changes to the walls of its Cells, including ones written to
+        the Cells directly, so anything derived from the walls can tell when
+        it's out of date.
+    """
+
+    def __init__(self, num_cols, num_rows, win=None) -> None:
+        """Instantiates the CellGrid with num_cols columns of num_rows new Cell
+        instances each, drawn on win if passed"""
+
+        self.version = 0
+        super().__init__(
+            [Cell(win, self) for _ in range(num_rows)]
+            for _ in range(num_cols))
+        return
+
+    def walls(self, i, j) -> int:
+        """Return the walls of Cell at (i, j) as a bitmask of LEFT, TOP, RIGHT
+        and BOTTOM"""
+
+        cell = self[i][j]
+        return (LEFT if cell.has_left_wall else 0) |\
+            (TOP if cell.has_top_wall else 0) |\
+            (RIGHT if cell.has_right_wall else 0) |\
+            (BOTTOM if cell.has_bottom_wall else 0)
+
+    def break_wall(self, i, j, wall) -> None:
+        """Break the wall (one of LEFT, TOP, RIGHT or BOTTOM) of Cell at
+        (i, j)"""
+
+        cell = self[i][j]
+        if wall == LEFT:
+            cell.has_left_wall = False
+        elif wall == TOP:
+            cell.has_top_wall = False
+        elif wall == RIGHT:
+            cell.has_right_wall = False
+        elif wall == BOTTOM:
+            cell.has_bottom_wall = False
+        return
+
+    def is_visited(self, i, j) -> bool:
+        """Check if Cell at (i, j) is visited"""
+
+        return self[i][j].visited
+
+    def set_visited(self, i, j, visited=True) -> None:
+        """Mark Cell at (i, j) as visited unless visited is False"""
+
+        self[i][j].visited = visited
+        return
+
+    def reset_visited(self) -> None:
+        """Mark all Cells as not visited"""
+
+        for col in self:
+            for cell in col:
+                cell.visited = False
+        return
+
+    def row_walls(self, j) -> bytes:
+        """Return the walls of every Cell of row j, as bitmasks"""
+
+        return bytes(self.walls(i, j) for i in range(len(self)))
+
+
+class PackedGrid():
+    """Compact grid of Maze cells packed into a bytearray
+
+    Every cell takes a single byte holding its LEFT, TOP, RIGHT and BOTTOM wall
+    bits and the VISITED bit, stored row after row, so a grid of a few million
+    cells takes a few MB instead of the hundreds of bytes per Cell instance of
+    CellGrid.
+
+    Indexing it the same way as CellGrid, i.e., grid[i][j], returns a PackedCell
+    view of the cell in column i and row j, so code written against Cell
+    instances keeps working, albeit slower than using the accessors directly.
+
+    Attributes
+    ----------
+    num_cols : int
+        number of columns in grid.
+    num_rows : int
+        number of rows in grid.
+    _data : bytearray
+        one byte per cell, the cell at (i, j) being at j * num_cols + i.
+    _geometry : tuple[int, int, int, int]
+        x1, y1, cell_size_x, cell_size_y used to place the PackedCell views.
+    _win : graphics.Window
+        Window class instance passed on to the PackedCell views.
+    _line_ids : dict[int, list[int]]
+        canvas item ids of the Lines drawn for each cell, by cell index, so
+        they outlive the PackedCell views which drew them.
+    version : int
+        counts changes to the walls, so anything derived from the walls can
+        tell when it's out of date.
+    """
+
+    def __init__(self, num_cols, num_rows, geometry=(0, 0, 0, 0),
+                 win=None) -> None:
+        """Instantiates the PackedGrid with all walls of every cell existing
+        and no cell visited"""
+
+        self.num_cols = num_cols
+        self.num_rows = num_rows
+        self._data = bytearray([ALL_WALLS]) * (num_cols * num_rows)
+        self._geometry = geometry
+        self._win = win
+        self._line_ids = {}
+        self.version = 0
+        return
+
+    def __len__(self) -> int:
+        """Number of columns, same as len() of CellGrid"""
+
+        return self.num_cols
+
+    def __getitem__(self, i):
+        """Return the column i as a _PackedColumn"""
+
+        if i < 0:
+            i += self.num_cols
+        if not 0 <= i < self.num_cols:
+            raise IndexError("PackedGrid column index out of range")
+        return _PackedColumn(self, i)
+
+    def __iter__(self):
+        """Iterate over the columns of the grid"""
+
+        for i in range(self.num_cols):
+            yield _PackedColumn(self, i)
+
+    def walls(self, i, j) -> int:
+        """Return the walls of cell at (i, j) as a bitmask of LEFT, TOP, RIGHT
+        and BOTTOM"""
+
+        return self._data[j * self.num_cols + i] & ALL_WALLS
+
+    def break_wall(self, i, j, wall) -> None:
+        """Break the wall (one of LEFT, TOP, RIGHT or BOTTOM) of cell at
+        (i, j)"""
+
+        self._data[j * self.num_cols + i] &= ~wall
+        self.version += 1
+        return
+
+    def is_visited(self, i, j) -> bool:
+        """Check if cell at (i, j) is visited"""
+
+        return bool(self._data[j * self.num_cols + i] & VISITED)
+
+    def set_visited(self, i, j, visited=True) -> None:
+        """Mark cell at (i, j) as visited unless visited is False"""
+
+        if visited:
+            self._data[j * self.num_cols + i] |= VISITED
+        else:
+            self._data[j * self.num_cols + i] &= ~VISITED
+        return
+
+    def reset_visited(self) -> None:
+        """Mark all cells as not visited"""
+
+        self._data = self._data.translate(_CLEAR_VISITED)
+        return
+
+    def row_walls(self, j) -> bytes:
+        """Return the walls of every cell of row j, as bitmasks"""
+
+        row = self._data[j * self.num_cols:(j + 1) * self.num_cols]
+        return bytes(row.translate(_WALLS_ONLY))
+
+    def _get_flags(self, index) -> int:
+        """Return the wall and VISITED bits of the cell at index"""
+
+        return self._data[index]
+
+    def _set_flags(self, index, flags) -> None:
+        """Set the wall and VISITED bits of the cell at index, only counting a
+        change of version if its walls change"""
+
+        if (self._data[index] ^ flags) & ALL_WALLS:
+            self.version += 1
+        self._data[index] = flags
+        return
+
+
+class NumpyGrid(PackedGrid):
+    """Grid of Maze cells stored in a 2-D NumPy array
+
+    Cells use the same one byte layout as PackedGrid, but in a uint8 array of
+    shape (num_rows, num_cols), i.e., indexed as array[j, i], so operations on
+    the whole grid run as vectorized NumPy operations rather than Python loops.
+    Single cells are still read and written through a memoryview of the array,
+    which is as fast as the bytearray of PackedGrid.
+
+    NumPy is an optional dependency, imported when the grid is instantiated.
+
+    Attributes
+    ----------
+    array : numpy.ndarray
+        wall and VISITED bits of every cell, indexed as array[j, i].
+    _data : memoryview
+        flat view of array, the cell at (i, j) being at j * num_cols + i.
+    """
+
+    def __init__(self, num_cols, num_rows, geometry=(0, 0, 0, 0),
+                 win=None) -> None:
+        """Instantiates the NumpyGrid with all walls of every cell existing
+        and no cell visited
+
+        Raises ImportError if NumPy isn't installed.
+        """
+
+        np = _import_numpy()
+        self.num_cols = num_cols
+        self.num_rows = num_rows
+        self.array = np.full((num_rows, num_cols), ALL_WALLS, dtype=np.uint8)
+        self._data = memoryview(self.array.reshape(-1))
+        self._geometry = geometry
+        self._win = win
+        self._line_ids = {}
+        self.version = 0
+        return
+
+    def reset_visited(self) -> None:
+        """Mark all cells as not visited"""
+
+        self.array &= ALL_WALLS
+        return
+
+    def row_walls(self, j) -> bytes:
+        """Return the walls of every cell of row j, as bitmasks"""
+
+        return (self.array[j] & ALL_WALLS).tobytes()
+
+    def passages(self):
+        """Return the open passages out of every cell, as a uint8 array of
+        shape (num_rows, num_cols)
+
+        A cell gets the LEFT, TOP, RIGHT and BOTTOM bits of every direction it
+        can be left in, i.e., unless both cells still have their common wall
+        or it leads out of the grid, the same as Maze._passages.
+        """
+
+        np = _import_numpy()
+        walls = self.array
+        passages = np.zeros_like(walls)
+        # True where the wall between a cell and the next one still stands,
+        # horizontally and vertically
+        across = (walls[:, :-1] & RIGHT != 0) & (walls[:, 1:] & LEFT != 0)
+        down = (walls[:-1] & BOTTOM != 0) & (walls[1:] & TOP != 0)
+        passages[:, :-1] |= ~across * np.uint8(RIGHT)
+        passages[:, 1:] |= ~across * np.uint8(LEFT)
+        passages[:-1] |= ~down * np.uint8(BOTTOM)
+        passages[1:] |= ~down * np.uint8(TOP)
+        return passages
+
+    def degrees(self):
+        """Return the number of open passages out of every cell, as a uint8
+        array of shape (num_rows, num_cols)"""
+
+        np = _import_numpy()
+        return np.array(_BIT_COUNTS, dtype=np.uint8)[self.passages()]
+
+    def count_dead_ends(self) -> int:
+        """Count the cells with a single open passage"""
+
+        return int((self.degrees() == 1).sum())
+
+
+def _import_numpy():
+    """Import NumPy, which only the grids built on it need"""
+
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "NumPy is required for this grid, install it with "
+            "pip install maniac_maze_solver[numpy]") from e
+    return numpy
+
+
+class _PackedColumn():
+    """Column i of a PackedGrid, indexed by row to get PackedCell views"""
+
+    def __init__(self, grid, i) -> None:
+        self._grid = grid
+        self._i = i
+        return
+
+    def __len__(self) -> int:
+        return self._grid.num_rows
+
+    def __getitem__(self, j):
+        if j < 0:
+            j += self._grid.num_rows
+        if not 0 <= j < self._grid.num_rows:
+            raise IndexError("PackedGrid row index out of range")
+        return PackedCell(self._grid, self._i, j)
+
+    def __iter__(self):
+        for j in range(self._grid.num_rows):
+            yield PackedCell(self._grid, self._i, j)
+
+
+class PackedCell(Cell):
+    """Lightweight Cell view of a single cell of a PackedGrid
+
+    The wall and visited attributes read and write the bits of the cell in the
+    grid, everything else behaves like a Cell instance placed at the cell's
+    position in the grid. Views are created on demand and are not kept by the
+    grid, so anything set on them only lives as long as the view, apart from
+    the canvas item ids of the drawn Lines which the grid keeps.
+    """
+
+    __slots__ = ("_grid", "_index")
+
+    def __init__(self, grid, i, j) -> None:
+        """Instantiates the view of cell at (i, j) of grid"""
+
+        x1, y1, cell_size_x, cell_size_y = grid._geometry
+        self._grid = grid
+        self._index = j * grid.num_cols + i
+        self._x1 = x1 + i * cell_size_x
+        self._y1 = y1 + j * cell_size_y
+        self._x2 = self._x1 + cell_size_x
+        self._y2 = self._y1 + cell_size_y
+        self._win = grid._win
+        return
+
+    def _get_bit(self, bit) -> bool:
+        return bool(self._grid._get_flags(self._index) & bit)
+
+    def _set_bit(self, bit, value) -> None:
+        flags = self._grid._get_flags(self._index)
+        self._grid._set_flags(
+            self._index, flags | bit if value else flags & ~bit)
+        return
+
+    has_left_wall = property(
+        lambda self: self._get_bit(LEFT),
+        lambda self, value: self._set_bit(LEFT, value))
+    has_top_wall = property(
+        lambda self: self._get_bit(TOP),
+        lambda self, value: self._set_bit(TOP, value))
+    has_right_wall = property(
+        lambda self: self._get_bit(RIGHT),
+        lambda self, value: self._set_bit(RIGHT, value))
+    has_bottom_wall = property(
+        lambda self: self._get_bit(BOTTOM),
+        lambda self, value: self._set_bit(BOTTOM, value))
+    visited = property(
+        lambda self: self._get_bit(VISITED),
+        lambda self, value: self._set_bit(VISITED, value))
+    _line_ids = property(
+        lambda self: self._grid._line_ids.get(self._index),
+        lambda self, value: self._grid._line_ids.__setitem__(
+            self._index, value))
+
+
+class NibbleGrid(PackedGrid):
+    """Grid of Maze cells stored as 4-bit wall nibbles in an existing buffer
+
+    This reads and writes the walls of every cell directly in buffer, e.g., a
+    memory-mapped maze file (see mazefile), two cells per byte, so nothing is
+    copied up front and only the parts of the buffer which are actually
+    accessed get paged in. Rows start at offset and are padded to a whole
+    number of bytes, the cell at (i, j) being the low nibble of byte
+    offset + j * stride + i // 2 if i is even else its high nibble.
+
+    Visited cells are kept in a set rather than in the buffer, as visiting is
+    typically sparse compared to the size of such a grid.
+
+    Attributes
+    ----------
+    stride : int
+        number of bytes per row, i.e., (num_cols + 1) // 2.
+    _buffer : bytearray | mmap.mmap
+        writable buffer holding the nibbles.
+    _offset : int
+        position of the first row in _buffer.
+    _visited : set[int]
+        indices, i.e., j * num_cols + i, of the visited cells.
+    """
+
+    def __init__(self, buffer, offset, num_cols, num_rows,
+                 geometry=(0, 0, 0, 0), win=None) -> None:
+        """Instantiates the NibbleGrid over the rows of buffer from offset"""
+
+        self.num_cols = num_cols
+        self.num_rows = num_rows
+        self.stride = (num_cols + 1) // 2
+        self._buffer = buffer
+        self._offset = offset
+        self._visited = set()
+        self._geometry = geometry
+        self._win = win
+        self._line_ids = {}
+        self.version = 0
+        return
+
+    def walls(self, i, j) -> int:
+        """Return the walls of cell at (i, j) as a bitmask of LEFT, TOP, RIGHT
+        and BOTTOM"""
+
+        byte = self._buffer[self._offset + j * self.stride + (i >> 1)]
+        return byte >> 4 if i & 1 else byte & ALL_WALLS
+
+    def break_wall(self, i, j, wall) -> None:
+        """Break the wall (one of LEFT, TOP, RIGHT or BOTTOM) of cell at
+        (i, j)"""
+
+        self._set_walls(i, j, self.walls(i, j) & ~wall)
+        return
+
+    def is_visited(self, i, j) -> bool:
+        """Check if cell at (i, j) is visited"""
+
+        return j * self.num_cols + i in self._visited
+
+    def set_visited(self, i, j, visited=True) -> None:
+        """Mark cell at (i, j) as visited unless visited is False"""
+
+        if visited:
+            self._visited.add(j * self.num_cols + i)
+        else:
+            self._visited.discard(j * self.num_cols + i)
+        return
+
+    def reset_visited(self) -> None:
+        """Mark all cells as not visited"""
+
+        self._visited.clear()
+        return
+
+    def row_walls(self, j) -> bytes:
+        """Return the walls of every cell of row j, as bitmasks, only reading
+        that row from the buffer"""
+
+        start = self._offset + j * self.stride
+        nibbles = bytes(self._buffer[start:start + self.stride])
+        walls = bytearray(2 * self.stride)
+        walls[0::2] = nibbles.translate(_WALLS_ONLY)
+        walls[1::2] = nibbles.translate(_HIGH_NIBBLE)
+        return bytes(walls[:self.num_cols])
+
+    def _set_walls(self, i, j, walls) -> None:
+        """Overwrite the walls nibble of cell at (i, j)"""
+
+        position = self._offset + j * self.stride + (i >> 1)
+        byte = self._buffer[position]
+        if i & 1:
+            self._buffer[position] = (byte & ALL_WALLS) | (walls << 4)
+        else:
+            self._buffer[position] = (byte & ~ALL_WALLS & 0xff) | walls
+        self.version += 1
+        return
+
+    def _get_flags(self, index) -> int:
+        """Return the wall and VISITED bits of the cell at index"""
+
+        i, j = index % self.num_cols, index // self.num_cols
+        return self.walls(i, j) | (VISITED if index in self._visited else 0)
+
+    def _set_flags(self, index, flags) -> None:
+        """Set the wall and VISITED bits of the cell at index, only counting a
+        change of version if its walls change"""
+
+        i, j = index % self.num_cols, index // self.num_cols
+        if self.walls(i, j) != flags & ALL_WALLS:
+            self._set_walls(i, j, flags & ALL_WALLS)
+        self.set_visited(i, j, bool(flags & VISITED))
+        return
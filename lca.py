@@ -0,0 +1,122 @@
+from array import array
+
+
+class LCAIndex():
+    """Lowest common ancestor index of a perfect Maze, i.e., a tree
+
+    The part of the Maze reachable from the root Cell is rooted there with a
+    Breadth-First search, which records the parent and depth of every Cell.
+    On top of that, every Cell gets a single jump pointer to one of its
+    ancestors, chosen like in skew-binary numbers so that following jumps and
+    parents reaches any ancestor in O(log n) steps. This is binary lifting
+    with one pointer per Cell rather than log n of them, so the index takes
+    three integers per Cell and is built in a single pass.
+
+    Cells are Cell indices, the Cell at (i, j) being at j * num_cols + i like
+    in Maze._passages.
+
+    Attributes
+    ----------
+    root : int
+        Cell at the root of the tree.
+    parents : array.array
+        parent of every Cell, the root being its own parent, -1 for Cells
+        which can't be reached from the root.
+    depths : array.array
+        number of moves from the root to every Cell, -1 for Cells which can't
+        be reached from the root.
+    jumps : array.array
+        ancestor every Cell jumps to, -1 for Cells which can't be reached from
+        the root.
+    """
+
+    def __init__(self, passages, moves, root=0) -> None:
+        """Instantiates the LCAIndex of the Maze with the given passages and
+        moves (see Maze._passages and Maze._moves) rooted at root
+
+        Raises ValueError if the part of the Maze reachable from root has
+        loops, i.e., isn't a tree.
+        """
+
+        self.root = root
+        parents = self.parents = array("l", [-1]) * len(passages)
+        depths = self.depths = array("l", [-1]) * len(passages)
+        jumps = self.jumps = array("l", [-1]) * len(passages)
+        parents[root] = jumps[root] = root
+        depths[root] = 0
+        # Cells are added in Breadth-First order, so parents always come first
+        layer, depth = [root], 0
+        while layer:
+            depth += 1
+            next_layer = []
+            for node in layer:
+                parent = parents[node]
+                jump = jumps[node]
+                # jump twice as far when both jumps below are as long
+                if depths[node] - depths[jump] ==\
+                        depths[jump] - depths[jumps[jump]]:
+                    jump = jumps[jump]
+                else:
+                    jump = node
+                for offset in moves[passages[node]]:
+                    child = node + offset
+                    if child == parent:
+                        continue
+                    if depths[child] >= 0:
+                        raise ValueError("Maze has loops, it isn't a tree")
+                    parents[child] = node
+                    depths[child] = depth
+                    jumps[child] = jump
+                    next_layer.append(child)
+            layer = next_layer
+        return
+
+    def lca(self, a, b) -> int:
+        """Return the lowest common ancestor of Cells a and b
+
+        Raises ValueError if either Cell can't be reached from the root.
+        """
+
+        parents, depths, jumps = self.parents, self.depths, self.jumps
+        for node in (a, b):
+            if depths[node] < 0:
+                raise ValueError(f"Cell {node} can't be reached")
+        if depths[a] < depths[b]:
+            a, b = b, a
+        depth = depths[b]
+        while depths[a] > depth:
+            a = jumps[a] if depths[jumps[a]] >= depth else parents[a]
+        # a and b are at the same depth from now on, and so are their jumps
+        while a != b:
+            if jumps[a] != jumps[b]:
+                a, b = jumps[a], jumps[b]
+            else:
+                a, b = parents[a], parents[b]
+        return a
+
+    def distance(self, a, b) -> int:
+        """Return the number of moves between Cells a and b
+
+        Raises ValueError if either Cell can't be reached from the root.
+        """
+
+        depths = self.depths
+        return depths[a] + depths[b] - 2 * depths[self.lca(a, b)]
+
+    def path(self, a, b) -> list[int]:
+        """Return the path of Cells from a to b, in time proportional to its
+        length
+
+        Raises ValueError if either Cell can't be reached from the root.
+        """
+
+        parents = self.parents
+        ancestor = self.lca(a, b)
+        path, back = [a], [b]
+        while path[-1] != ancestor:
+            path.append(parents[path[-1]])
+        while back[-1] != ancestor:
+            back.append(parents[back[-1]])
+        back.pop()
+        back.reverse()
+        return path + back
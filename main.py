@@ -1,28 +1,326 @@
-from graphics import Window
+from generators import ALGORITHMS
+from time import perf_counter
+from graphics import SPEEDS, Window
 from maze import Maze
+from stats import MazeStats
+import batch as maze_batch
+import bench as maze_bench
 import click
+import json
+import mazefile
+import random
+import render as maze_render
+import stream as row_stream
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option(
     '--maze-size',
     type=(int, int),
     default=(15, 15),
     show_default=True,
     help='row, column for the maze')
-def main(maze_size) -> None:
-    """Welcome to Maniac's Maze solver"""
+@click.option(
+    '--speed',
+    type=click.Choice(list(SPEEDS)),
+    default='normal',
+    show_default=True,
+    help='animation speed, "instant" only redraws to keep the window live')
+@click.option(
+    '--algorithm',
+    type=click.Choice(list(ALGORITHMS)),
+    default='backtracker',
+    show_default=True,
+    help='maze generation algorithm')
+@click.option(
+    '--seed',
+    type=int,
+    default=None,
+    help='seed for a reproducible maze')
+@click.option(
+    '--stats',
+    'show_stats',
+    is_flag=True,
+    help='count and time the maze operations, reported once closed')
+@click.pass_context
+def main(ctx, maze_size, speed, algorithm, seed, show_stats) -> None:
+    """Welcome to Maniac's Maze solver
 
+    Without a command, build and solve a maze in a window.
+    """
+
+    if ctx.invoked_subcommand is not None:
+        return
     startx, starty = 25, 25
     row, col = maze_size
     cellx, celly = 50, 50
     height = 2 * startx + row * cellx
     width = 2 * starty + col * celly
-    win = Window(height, width)
-    m = Maze(startx, starty, row, col, cellx, celly, win)
+    stats = MazeStats() if show_stats else None
+    win = Window(height, width, speed=speed, stats=stats)
+    m = Maze(startx, starty, row, col, cellx, celly, win, seed=seed,
+             stats=stats)
     m._break_entrance_and_exit()
-    m._break_walls_r(0, 0)
-    m._draw_start_line()
-    m._solve()
-    m._draw_end_line()
+
+    def events():
+        yield from m.iter_generate(algorithm)
+        m._draw_start_line()
+        yield from m.iter_solve("dfs")
+        m._draw_end_line()
+
+    win.play(events(), m.draw_event)
     win.wait_for_close()
+    if stats is not None:
+        click.echo(stats.report(), err=True)
+
+
+@main.command()
+@click.option(
+    '--maze-size',
+    type=(int, int),
+    default=(15, 15),
+    show_default=True,
+    help='row, column for the maze')
+@click.option(
+    '--algorithm',
+    type=click.Choice(row_stream.ROW_ALGORITHMS),
+    default='eller',
+    show_default=True,
+    help='row by row maze generation algorithm')
+@click.option(
+    '--seed',
+    type=int,
+    default=None,
+    help='seed for a reproducible maze')
+@click.option(
+    '--format',
+    'output_format',
+    type=click.Choice(['text', 'binary']),
+    default='text',
+    show_default=True,
+    help='ASCII art, or the maze file format of mazefile')
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    default='-',
+    show_default=True,
+    help='file to write the maze to')
+def stream(maze_size, algorithm, seed, output_format, output) -> None:
+    """Stream a maze of any number of rows, one row at a time"""
+
+    row, col = maze_size
+    rows = row_stream.iter_rows(col, row, algorithm, random.Random(seed))
+    if output_format == 'binary':
+        # checked before opening output so a bad seed leaves no file behind
+        try:
+            header = mazefile.pack_header(col, row, seed, algorithm)
+        except ValueError as error:
+            raise click.BadParameter(str(error), param_hint="'--seed'")
+        with click.open_file(output, 'wb') as out:
+            out.write(header)
+            mazefile.write_rows(rows, out)
+    else:
+        with click.open_file(output, 'w') as out:
+            row_stream.write_text(rows, out)
+
+
+@main.command()
+@click.option(
+    '--count',
+    type=click.IntRange(min=1),
+    default=100,
+    show_default=True,
+    help='number of mazes to generate')
+@click.option(
+    '--maze-size',
+    '--size',
+    type=(int, int),
+    default=(15, 15),
+    show_default=True,
+    help='row, column for every maze')
+@click.option(
+    '--algorithm',
+    type=click.Choice(list(ALGORITHMS)),
+    default='backtracker',
+    show_default=True,
+    help='maze generation algorithm')
+@click.option(
+    '--workers',
+    type=click.IntRange(min=1),
+    default=None,
+    help='number of worker processes  [default: number of CPUs]')
+@click.option(
+    '--seed',
+    type=int,
+    default=None,
+    help='seed for a reproducible batch')
+@click.option(
+    '--solve',
+    is_flag=True,
+    help='also solve every maze, recording its solution length')
+@click.option(
+    '--out',
+    'directory',
+    type=click.Path(file_okay=False, writable=True),
+    default='mazes',
+    show_default=True,
+    help='directory to write the maze files and manifest to')
+def batch(count, maze_size, algorithm, workers, seed, solve,
+          directory) -> None:
+    """Generate many mazes headlessly across a pool of processes"""
+
+    row, col = maze_size
+    started = perf_counter()
+    with click.progressbar(length=count, label='Generating mazes',
+                           file=click.get_text_stream('stderr')) as bar:
+        for _ in maze_batch.run(count, col, row, directory, algorithm, seed,
+                                workers, solve):
+            bar.update(1)
+    elapsed = perf_counter() - started
+    click.echo(f"Wrote {count} mazes to {directory} in {elapsed:.2f}s "
+               f"({count / elapsed:.1f} mazes/s)", err=True)
+
+
+@main.command()
+@click.option(
+    '--size',
+    'sizes',
+    type=click.IntRange(min=1),
+    multiple=True,
+    default=maze_bench.SIZES,
+    show_default=True,
+    help='rows and columns of a benchmarked maze, repeat for several sizes')
+@click.option(
+    '--case',
+    'cases',
+    type=click.Choice(list(maze_bench.CASES)),
+    multiple=True,
+    default=list(maze_bench.CASES),
+    show_default=True,
+    help='operation to benchmark, repeat for several cases')
+@click.option(
+    '--backend',
+    type=click.Choice(['cells', 'packed', 'numpy']),
+    default='cells',
+    show_default=True,
+    help='storage of the maze cells')
+@click.option(
+    '--repeat',
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help='number of timed runs, keeping the best one')
+@click.option(
+    '--memory/--no-memory',
+    default=True,
+    show_default=True,
+    help='also measure peak memory with tracemalloc')
+@click.option(
+    '--imports/--no-imports',
+    default=True,
+    show_default=True,
+    help='also time importing the maze modules in a fresh interpreter')
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False, writable=True, allow_dash=True),
+    default='-',
+    show_default=True,
+    help='file to write the JSON results to')
+def bench(sizes, cases, backend, repeat, memory, imports, output) -> None:
+    """Benchmark creating, generating, solving and rendering mazes"""
+
+    import_results = []
+    if imports:
+        for result in maze_bench.import_times(repeat=repeat):
+            click.echo(f"{'import':>12} {result['module']:<11} "
+                       f"{result['seconds']:10.4f}s "
+                       f"loading {' '.join(result['loaded']) or 'nothing'}",
+                       err=True)
+            import_results.append(result)
+    results = []
+    for result in maze_bench.run(sizes, cases, backend, repeat, memory):
+        click.echo(f"{result['case']:>12} {result['size']:>5}x"
+                   f"{result['size']:<5} {result['seconds']:10.4f}s "
+                   f"{result['cells_per_sec']:14,.0f} cells/s", err=True)
+        results.append(result)
+    with click.open_file(output, 'w') as out:
+        json.dump({"environment": maze_bench.environment(),
+                   "imports": import_results,
+                   "results": results}, out, indent=2)
+        out.write("\n")
+
+
+@main.command()
+@click.option(
+    '--maze-size',
+    type=(int, int),
+    default=(15, 15),
+    show_default=True,
+    help='row, column for the maze')
+@click.option(
+    '--algorithm',
+    type=click.Choice(list(ALGORITHMS)),
+    default='backtracker',
+    show_default=True,
+    help='maze generation algorithm')
+@click.option(
+    '--seed',
+    type=int,
+    default=None,
+    help='seed for a reproducible maze')
+@click.option(
+    '--input',
+    'input_path',
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help='maze file to render instead of generating a maze')
+@click.option(
+    '--cell-size',
+    type=click.IntRange(min=1),
+    default=10,
+    show_default=True,
+    help='size of every cell in pixels')
+@click.option(
+    '--wall-width',
+    type=click.IntRange(min=1),
+    default=2,
+    show_default=True,
+    help='width of the walls and solution path in pixels')
+@click.option(
+    '--compression',
+    type=click.IntRange(0, 9),
+    default=1,
+    show_default=True,
+    help='zlib compression level of PNG images, higher is smaller but slower')
+@click.option(
+    '--solve/--no-solve',
+    default=True,
+    show_default=True,
+    help='draw the shortest solution path')
+@click.option(
+    '--output',
+    type=click.Path(dir_okay=False, writable=True),
+    required=True,
+    help='image file to write, SVG or PPM if it ends with .svg or .ppm, '
+         'else PNG')
+def render(maze_size, algorithm, seed, input_path, cell_size, wall_width,
+           compression, solve, output) -> None:
+    """Render a maze to a PNG, PPM or SVG image without any window"""
+
+    if input_path is not None:
+        m = mazefile.load(input_path)
+    else:
+        row, col = maze_size
+        m = Maze(0, 0, row, col, 1, 1, backend='packed', render=False,
+                 seed=seed)
+        m._break_entrance_and_exit()
+        m.generate(algorithm)
+    path = m.solve('bfs') if solve else None
+    if output.lower().endswith('.svg'):
+        with open(output, 'w') as out:
+            out.write(maze_render.to_svg(m, path, (cell_size, cell_size),
+                                         (cell_size, cell_size), wall_width))
+        return
+    raster = maze_render.rasterize(m, path, (cell_size, cell_size),
+                                   (cell_size, cell_size), wall_width)
+    raster.save(output, compression)
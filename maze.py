@@ -1,7 +1,15 @@
-from cell import Cell
-from graphics import Line, Point
-from time import sleep
+from graph import JunctionGraph
+from graphics import Line, Point, SharedGeometry
+from grid import CellGrid, NibbleGrid, NumpyGrid, PackedGrid
+from grid import LEFT, TOP, RIGHT, BOTTOM
+from lca import LCAIndex
+import generators
 import random
+import solvers
+
+# layers of Maze.distance_field with at-least that many Cells are expanded
+# with NumPy array operations rather than Cell by Cell
+_ARRAY_LAYER_SIZE = 64
 
 
 class Maze():
@@ -30,8 +38,39 @@ class Maze():
         size of cell wall in maze along y axis, i.e., width.
     _win : graphics.Window
         Window class instance on which the maze would be built and solved.
-    _cells : list[list[Cell]]
-        list of lists of Cell class instances which build up the Maze.
+    backend : str
+        storage used for the Maze cells, "cells", "packed" or "numpy".
+    render : bool
+        determines weather the Maze cells and moves are drawn at all, when
+        False no geometry is created for the cells.
+    algorithm : str | None
+        name of the algorithm which generated the Maze with Maze.generate or
+        Maze.iter_generate, if any.
+    seed : int | None
+        seed of the random numbers which generated the Maze, if known.
+    _rng : random.Random
+        random number generator used to generate the Maze, which is never
+        shared with other Maze instances unless passed to all of them.
+    stats : stats.MazeStats | None
+        counters and timers of the Maze operations, if instrumented.
+    _shared_geometry : graphics.SharedGeometry
+        Points and Lines shared by the Cells drawn, so corners and walls
+        common to neighbouring Cells exist once.
+    _cells : grid.CellGrid | grid.PackedGrid | grid.NumpyGrid
+        grid of Cells which build up the Maze, indexed as _cells[i][j] for
+        column i and row j.
+    _passages_index : bytearray | None
+        open passages out of every Cell, see Maze._passages.
+    _passages_version : int | None
+        version of _cells when _passages_index was built.
+    _junction_graph : graph.JunctionGraph | None
+        junctions of the Maze, see Maze.junction_graph.
+    _junction_graph_version : int | None
+        version of _cells when _junction_graph was built.
+    _lca_index : lca.LCAIndex | None
+        tree of the Maze for path queries, see Maze.path.
+    _lca_index_version : int | None
+        version of _cells when _lca_index was built.
     """
 
     def __init__(
@@ -42,13 +81,44 @@ class Maze():
             num_cols,
             cell_size_x,
             cell_size_y,
-            win=None) -> None:
+            win=None,
+            backend="cells",
+            render=True,
+            grid=None,
+            seed=None,
+            rng=None,
+            stats=None) -> None:
         """Instantiates the Maze class
 
         This method create the instance of Maze by first setting the attributes
         passed from driver code, and then invokes the Maze._create_cells to
         create Cell instance for the Maze using the attributes passed to
         __init__.
+
+        The default "cells" backend stores a Cell instance per grid square,
+        whereas the "packed" backend stores the walls and visited flag of each
+        grid square in a single byte (see grid.PackedGrid), making large mazes
+        take a fraction of the memory. The "numpy" backend stores those same
+        bytes in a NumPy array (see grid.NumpyGrid), which makes operations on
+        the whole Maze, e.g., Maze.count_dead_ends, run as vectorized NumPy
+        operations, and requires NumPy to be installed.
+
+        Passing render as False builds a headless Maze which never draws, so
+        generation and solving run without allocating any Line or Point. The
+        geometry of any Cell can still be computed on demand with
+        Maze.cell_geometry.
+
+        An existing grid of num_cols columns and num_rows rows, e.g., a
+        grid.NibbleGrid loaded by mazefile.load, can be passed to be used as is
+        instead of creating new cells, in which case backend is ignored.
+
+        Every Maze draws its random numbers from its own random.Random seeded
+        with seed, so the same seed always generates the same Maze, and mazes
+        generated concurrently don't interfere. A random.Random instance to use
+        instead can be passed as rng.
+
+        Passing a stats.MazeStats as stats counts and times the operations of
+        the Maze, see stats.MazeStats, which costs a little on every operation.
         """
 
         self.x1 = x1
@@ -58,25 +128,55 @@ class Maze():
         self.cell_size_x = cell_size_x
         self.cell_size_y = cell_size_y
         self._win = win
-        self._create_cells()
+        if grid is not None:
+            backend = "packed"
+        if backend not in ("cells", "packed", "numpy"):
+            raise ValueError(f"Unknown Maze backend: {backend}")
+        self.backend = backend
+        self.render = render
+        self.algorithm = None
+        self.seed = seed
+        self._rng = rng if rng is not None else random.Random(seed)
+        self.stats = stats
+        self._shared_geometry = SharedGeometry()
+        self._passages_index = None
+        self._passages_version = None
+        self._junction_graph = None
+        self._junction_graph_version = None
+        self._lca_index = None
+        self._lca_index_version = None
+        self._create_cells(grid)
         return
 
-    def _create_cells(self) -> None:
+    def _create_cells(self, grid=None) -> None:
         """Create Maze cells
 
         This method creates an attribute called _cells for a given Maze instance
-        which is a list of lists of Cell class instances.
+        which is either a grid.CellGrid, i.e., list of lists of Cell class
+        instances, a grid.PackedGrid or a grid.NumpyGrid as per the Maze
+        backend, unless an existing grid is passed.
 
         Once the _cells is populated, it invokes Maze._draw_cell on each of
-        above create Cell instances.
+        above create Cell instances unless the Maze is headless.
         """
 
-        self._cells = []
-        for c in range(self.num_cols):
-            self._cells.append([])
-            for _ in range(self.num_rows):
-                self._cells[c].append(Cell(self._win))
+        if grid is not None:
+            self._cells = grid
+        elif self.backend == "packed":
+            self._cells = PackedGrid(
+                self.num_cols, self.num_rows,
+                (self.x1, self.y1, self.cell_size_x, self.cell_size_y),
+                self._win)
+        elif self.backend == "numpy":
+            self._cells = NumpyGrid(
+                self.num_cols, self.num_rows,
+                (self.x1, self.y1, self.cell_size_x, self.cell_size_y),
+                self._win)
+        else:
+            self._cells = CellGrid(self.num_cols, self.num_rows, self._win)
 
+        if not self.render:
+            return
         for i, cell_col in enumerate(self._cells):
             for j, cell in enumerate(cell_col):
                 self._draw_cell(cell, i, j)
@@ -93,29 +193,59 @@ class Maze():
         The top-left and bottom-right corners of every Cell instance is
         calculated using starting position of maze as well as size of cell walls
         specified during the Maze creation.
-        """
 
-        x = self.x1 + i * self.cell_size_x
-        y = self.y1 + j * self.cell_size_y
+        Nothing is drawn for a headless Maze.
+        """
 
-        cell.draw(x, y, x + self.cell_size_x, y + self.cell_size_y, fill_color)
+        if not self.render:
+            return
+        cell.draw(*self.cell_geometry(i, j), fill_color,
+                  self._shared_geometry)
+        if self.stats is not None:
+            self.stats.count("cells_drawn")
         self._animate()
         return
 
+    def cell_geometry(self, i, j, origin=None,
+                      cell_size=None) -> tuple[int, int, int, int]:
+        """Return the top-left and bottom-right corners of Cell at (i, j) as
+        x1, y1, x2, y2 on the canvas
+
+        origin, i.e., (x1, y1), and cell_size, i.e., (cell_size_x,
+        cell_size_y), default to the ones of the Maze, and can be passed to lay
+        the Maze out differently, e.g., when rendering it to an image.
+        """
+
+        x1, y1 = origin or (self.x1, self.y1)
+        cell_size_x, cell_size_y = cell_size or\
+            (self.cell_size_x, self.cell_size_y)
+        x = x1 + i * cell_size_x
+        y = y1 + j * cell_size_y
+        return x, y, x + cell_size_x, y + cell_size_y
+
+    def cell_center(self, i, j, origin=None,
+                    cell_size=None) -> tuple[float, float]:
+        """Return the center coordinate of Cell at (i, j) on the canvas, same as
+        Cell.get_center of a drawn Cell, see Maze.cell_geometry for origin and
+        cell_size"""
+
+        x1, y1, x2, y2 = self.cell_geometry(i, j, origin, cell_size)
+        return (x1 + x2) / 2, (y1 + y2) / 2
+
     def _break_entrance_and_exit(self) -> None:
         """This method removes the top wall from start Cell and bottom wall from
         end Cell of the Maze
 
-        It first marks the required wall as False, and invokes the
-        Maze._draw_cell to redraw that Cell on the canvas where the Maze is
+        It first breaks the required wall directly in the grid, and invokes
+        the Maze._draw_cell to redraw that Cell on the canvas where the Maze is
         previously already drawn.
         """
 
-        self._cells[0][0].has_top_wall = False
+        last_i, last_j = self.num_cols - 1, self.num_rows - 1
+        self._cells.break_wall(0, 0, TOP)
         self._draw_cell(self._cells[0][0], 0, 0)
-        self._cells[-1][-1].has_bottom_wall = False
-        self._draw_cell(self._cells[-1][-1], len(self._cells) - 1,
-                        len(self._cells[0]) - 1)
+        self._cells.break_wall(last_i, last_j, BOTTOM)
+        self._draw_cell(self._cells[last_i][last_j], last_i, last_j)
         return
 
     def _get_neighbours(self, i, j) -> list:
@@ -143,12 +273,127 @@ class Maze():
             neighbours.append((i, j + 1))
         return neighbours
 
+    def _break_wall_between(self, i, j, to_i, to_j) -> None:
+        """Break the common wall between Cell at (i, j) and its neighbouring
+        Cell at (to_i, to_j) by marking the wall as False on both Cells"""
+
+        if j == to_j:  # same row movement
+            if to_i > i:
+                self._cells.break_wall(i, j, RIGHT)
+                self._cells.break_wall(to_i, to_j, LEFT)
+            else:
+                self._cells.break_wall(i, j, LEFT)
+                self._cells.break_wall(to_i, to_j, RIGHT)
+        elif i == to_i:  # same column movement
+            if to_j > j:
+                self._cells.break_wall(i, j, BOTTOM)
+                self._cells.break_wall(to_i, to_j, TOP)
+            else:
+                self._cells.break_wall(i, j, TOP)
+                self._cells.break_wall(to_i, to_j, BOTTOM)
+        if self.stats is not None:
+            self.stats.count("walls_broken")
+        return
+
+    def _break_walls(self, i=0, j=0) -> bool:
+        """Break Maze Cell walls iteratively to build the Maze
+
+        This is the explicit-stack equivalent of Maze._break_walls_r and
+        carves exactly the same Maze for the same state of the Maze random
+        number generator, but without any limit on recursion depth. It runs
+        Maze.iter_break_walls to completion, redrawing both Cells of every
+        carved wall.
+
+        Returns True if the last Cell of maze was reached else False
+        """
+
+        for event in self.iter_break_walls(i, j):
+            if self.render:
+                self.draw_event(event)
+        return self._cells.is_visited(self.num_cols - 1, self.num_rows - 1)
+
+    def iter_break_walls(self, i=0, j=0, rng=None):
+        """Break Maze Cell walls iteratively, one wall at a time
+
+        This is a generator which yields ("carve", i, j, to_i, to_j) right after
+        breaking the wall between Cells at (i, j) and (to_i, to_j), without
+        drawing anything, so the caller decides when and how to show it. The
+        stack holds the path of Cells from (i, j) to the current Cell, so memory
+        grows linearly with the number of Cells. Neighbours are chosen with
+        rng, which defaults to the Maze random number generator.
+
+        - Mark the starting Cell as visited and push it onto the stack
+        - While the last Cell of maze is not visited:
+            - Get neighbours of the Cell on top of the stack which are not yet
+              visited
+            - If there's at-least one neighbour:
+                - Randomly choose one of those neighbours
+                - Break the wall between both Cells and yield the "carve" event
+                - Mark the neighbour as visited and push it onto the stack
+            - Else pop the Cell from the stack to backtrack, stopping if
+              there's nothing left to backtrack to
+        """
+
+        cells = self._cells
+        rng = rng if rng is not None else self._rng
+        end_i, end_j = len(cells) - 1, len(cells[0]) - 1
+        cells.set_visited(i, j)
+        stack = [(i, j)]
+        while not cells.is_visited(end_i, end_j):
+            if not stack:
+                return
+            i, j = stack[-1]
+            possible_directions = [
+                (n_i, n_j) for (n_i, n_j) in self._get_neighbours(i, j)
+                if not cells.is_visited(n_i, n_j)]
+            if len(possible_directions) == 0:
+                stack.pop()
+                continue
+            to_i, to_j = rng.choice(possible_directions)
+            self._break_wall_between(i, j, to_i, to_j)
+            cells.set_visited(to_i, to_j)
+            stack.append((to_i, to_j))
+            yield ("carve", i, j, to_i, to_j)
+        return
+
+    def generate(self, algorithm="backtracker") -> None:
+        """Build the Maze with the given generation algorithm
+
+        Available algorithms are the keys of generators.ALGORITHMS, the default
+        "backtracker" being the same as Maze._break_walls from 0, 0. It runs
+        Maze.iter_generate to completion, redrawing both Cells of every carved
+        wall.
+        """
+
+        for event in self.iter_generate(algorithm):
+            if self.render:
+                self.draw_event(event)
+        return
+
+    def iter_generate(self, algorithm="backtracker"):
+        """Build the Maze with the given generation algorithm, one wall at a
+        time
+
+        This returns a generator of ("carve", i, j, to_i, to_j) events, just
+        like Maze.iter_break_walls, without drawing anything.
+
+        Raises ValueError for an unknown algorithm.
+        """
+
+        if algorithm not in generators.ALGORITHMS:
+            raise ValueError(f"Unknown generation algorithm: {algorithm}")
+        self.algorithm = algorithm
+        return generators.ALGORITHMS[algorithm](self, self._rng)
+
     def _break_walls_r(self, i, j) -> bool:
         """Break Maze Cell walls recursively to build the Maze
 
         This first invocation of this method is done from driver code starting
         from first Cell, i.e, both i and j equal to 0
 
+        Prefer Maze._break_walls for anything but small mazes, since every
+        carved Cell adds a frame to the Python call stack here.
+
         - Mark the current Cell as visited
         - While the last Cell of maze is not visited:
             - Get neighbours of current Cell which are not yet visited
@@ -171,22 +416,8 @@ class Maze():
                 self._get_neighbours(i, j))]
             if len(possible_directions) == 0:
                 return False
-            to_i, to_j = random.choice(possible_directions)
-            if j == to_j:  # same row movement
-                if to_i > i:
-                    self._cells[i][j].has_right_wall = False
-                    self._cells[to_i][to_j].has_left_wall = False
-                else:
-                    self._cells[i][j].has_left_wall = False
-                    self._cells[to_i][to_j].has_right_wall = False
-            elif i == to_i:  # same column movement
-                if to_j > j:
-                    self._cells[i][j].has_bottom_wall = False
-                    self._cells[to_i][to_j].has_top_wall = False
-                else:
-                    self._cells[i][j].has_top_wall = False
-                    self._cells[to_i][to_j].has_bottom_wall = False
-
+            to_i, to_j = self._rng.choice(possible_directions)
+            self._break_wall_between(i, j, to_i, to_j)
             self._draw_cell(self._cells[i][j], i, j)
             self._draw_cell(self._cells[to_i][to_j], to_i, to_j)
             if not self._break_walls_r(to_i, to_j):
@@ -196,9 +427,7 @@ class Maze():
     def _reset_cells_visited(self) -> None:
         """Mark all Maze Cells as not visited"""
 
-        for row in self._cells:
-            for cell in row:
-                cell.visited = False
+        self._cells.reset_visited()
 
     def _is_not_blocked(self, x, y, to_x, to_y) -> bool:
         """Check if Cell at (x, y) is blocked or not to go Cell at (to_x, to_y)
@@ -234,9 +463,9 @@ class Maze():
     def _draw_start_line(self) -> bool:
         """Draw a line from top-mid of start Cell to center of start Cell"""
 
-        start_x, start_y = self._cells[0][0].get_center()
+        start_x, start_y = self.cell_center(0, 0)
         if start_x is not None and start_y is not None:
-            if self._win:
+            if self._win and self.render:
                 self._win.draw_line(Line(Point(start_x, start_y - self.y1),
                                          Point(start_x, start_y)), "red")
             return True
@@ -245,22 +474,469 @@ class Maze():
     def _draw_end_line(self) -> bool:
         """Draw a line from center of end Cell to bottom-mid of end Cell"""
 
-        end_x, end_y = self._cells[-1][-1].get_center()
+        end_x, end_y = self.cell_center(self.num_cols - 1, self.num_rows - 1)
         if end_x is not None and end_y is not None:
-            if self._win:
+            if self._win and self.render:
                 self._win.draw_line(Line(Point(end_x, end_y + self.y1),
                                          Point(end_x, end_y)), "red")
             return True
         return False
 
+    def _passages(self) -> bytearray:
+        """Return the index of open passages out of every Cell
+
+        The index holds a byte per Cell, the Cell at (i, j) being at
+        j * num_cols + i, with the LEFT, TOP, RIGHT and BOTTOM bits set for
+        every direction the Cell can be left in. It applies the same rule as
+        Maze._is_not_blocked, i.e., a move is blocked only when both Cells still
+        have their common wall, and never leads out of the Maze.
+
+        It's built once and kept until the walls change, as tracked by the
+        version of the grid, so solvers can look up the moves out of a Cell
+        with a single byte read.
+        """
+
+        if self._passages_index is None or\
+                self._passages_version != self._cells.version:
+            self._passages_version = self._cells.version
+            self._passages_index = self._build_passages()
+        return self._passages_index
+
+    def _build_passages(self) -> bytearray:
+        """Build the index returned by Maze._passages, row by row, or all at
+        once with the "numpy" backend"""
+
+        if self.backend == "numpy":
+            return bytearray(self._cells.passages().tobytes())
+        num_rows = self.num_rows
+        passages = bytearray()
+        above = None
+        row = self._cells.row_walls(0) if num_rows else None
+        for j in range(num_rows):
+            below = self._cells.row_walls(j + 1) if j < num_rows - 1 else None
+            passages += self._row_passages(above, row, below)
+            above, row = row, below
+        return passages
+
+    def _row_passages(self, above, row, below) -> bytearray:
+        """Return the passages of every Cell of a row, as in Maze._passages,
+        from the walls of the row and of the rows above and below it, None at
+        the edges of the Maze"""
+
+        num_cols = self.num_cols
+        passages = bytearray(num_cols)
+        for i in range(num_cols):
+            walls = row[i]
+            p = 0
+            if i != 0 and not (walls & LEFT and row[i - 1] & RIGHT):
+                p |= LEFT
+            if above is not None and not (walls & TOP and above[i] & BOTTOM):
+                p |= TOP
+            if i < num_cols - 1 and not (walls & RIGHT and row[i + 1] & LEFT):
+                p |= RIGHT
+            if below is not None and not (walls & BOTTOM and below[i] & TOP):
+                p |= BOTTOM
+            passages[i] = p
+        return passages
+
+    def _lazy_passages(self):
+        """Return a function returning the byte of Maze._passages of a Cell
+        index, only computing the passages of the rows asked for, once
+
+        This is how a grid.NibbleGrid over a memory-mapped maze file is
+        solved, so only the rows the search reaches are read from the file.
+        """
+
+        cells, num_cols, num_rows = self._cells, self.num_cols, self.num_rows
+        rows = {}
+
+        def passages_of(index):
+            j, i = divmod(index, num_cols)
+            row = rows.get(j)
+            if row is None:
+                row = rows[j] = self._row_passages(
+                    cells.row_walls(j - 1) if j else None, cells.row_walls(j),
+                    cells.row_walls(j + 1) if j < num_rows - 1 else None)
+            return row[i]
+
+        return passages_of
+
+    def junction_graph(self) -> JunctionGraph:
+        """Return the graph.JunctionGraph of the Maze, where nodes are its
+        junctions, dead ends, entrance and exit, and every corridor in between
+        is an edge weighted by its number of moves
+
+        Just like Maze._passages, it's built once and kept until the walls
+        change, so every "corridor" solve reuses it, only splicing in its own
+        start and goal Cells. Nodes are Cell indices, the Cell at (i, j) being
+        at j * num_cols + i, see JunctionGraph.to_dict to export it.
+        """
+
+        passages = self._passages()
+        if self._junction_graph is None or\
+                self._junction_graph_version != self._passages_version:
+            self._junction_graph_version = self._passages_version
+            self._junction_graph = JunctionGraph(
+                passages, self._moves(), (0, len(passages) - 1))
+        return self._junction_graph
+
+    def path(self, a, b) -> list[tuple[int, int]]:
+        """Return the path between Cells at a and b (i, j) coordinates, as a
+        list of (i, j) Cell coordinates from a to b
+
+        This is meant for perfect Mazes, e.g., carved by Maze._break_walls_r,
+        where there's a single path between any two Cells. The Maze is rooted
+        at its first Cell into an lca.LCAIndex, built once and kept until the
+        walls change, after which the path takes time proportional to its
+        length.
+
+        Raises ValueError if either Cell is outside of the Maze or can't be
+        reached from the first Cell, or if the Maze has loops.
+        """
+
+        num_cols = self.num_cols
+        index, a_index, b_index = self._lca_cells(a, b)
+        return [(cell % num_cols, cell // num_cols)
+                for cell in index.path(a_index, b_index)]
+
+    def distance(self, a, b) -> int:
+        """Return the number of moves between Cells at a and b (i, j)
+        coordinates, in O(log n) time, see Maze.path
+
+        Raises ValueError if either Cell is outside of the Maze or can't be
+        reached from the first Cell, or if the Maze has loops.
+        """
+
+        index, a_index, b_index = self._lca_cells(a, b)
+        return index.distance(a_index, b_index)
+
+    def _lca(self) -> LCAIndex:
+        """Return the lca.LCAIndex of the Maze rooted at its first Cell,
+        building it if the walls changed since it was last built"""
+
+        passages = self._passages()
+        if self._lca_index is None or\
+                self._lca_index_version != self._passages_version:
+            self._lca_index = LCAIndex(passages, self._moves())
+            self._lca_index_version = self._passages_version
+        return self._lca_index
+
+    def _lca_cells(self, a, b) -> tuple[LCAIndex, int, int]:
+        """Return the lca.LCAIndex of the Maze, see Maze._lca, along with the
+        indices of the Cells at a and b (i, j) coordinates
+
+        Raises ValueError if either Cell is outside of the Maze or can't be
+        reached from the first Cell, or if the Maze has loops.
+        """
+
+        index = self._lca()
+        cells = []
+        for cell in (a, b):
+            cell_index = self._cell_index(cell)
+            if index.depths[cell_index] < 0:
+                raise ValueError(f"Cell {cell} can't be reached")
+            cells.append(cell_index)
+        return index, cells[0], cells[1]
+
+    def _cell_index(self, cell) -> int:
+        """Return the index of the Cell at cell (i, j) coordinates in
+        Maze._passages
+
+        Raises ValueError if the Cell is outside of the Maze.
+        """
+
+        i, j = cell
+        if not (0 <= i < self.num_cols and 0 <= j < self.num_rows):
+            raise ValueError(f"Cell {cell} is outside of the Maze")
+        return j * self.num_cols + i
+
+    def degrees(self) -> list[list[int]]:
+        """Return the number of open passages out of every Cell, indexed as
+        degrees[i][j] for column i and row j like the Maze Cells
+
+        Moves are the ones of Maze._passages, so the entrance and exit don't
+        count. With the "numpy" backend this is a NumPy array computed with
+        vectorized operations.
+        """
+
+        if self.backend == "numpy":
+            return self._cells.degrees().T
+        counts = [bin(passages).count("1") for passages in range(16)]
+        passages = self._passages()
+        return [[counts[passages[j * self.num_cols + i]]
+                 for j in range(self.num_rows)] for i in range(self.num_cols)]
+
+    def count_dead_ends(self) -> int:
+        """Count the dead ends of the Maze, i.e., Cells with a single open
+        passage, see Maze.degrees"""
+
+        if self.backend == "numpy":
+            return self._cells.count_dead_ends()
+        passages = self._passages()
+        return sum(passages.count(bit) for bit in (LEFT, TOP, RIGHT, BOTTOM))
+
+    def distance_field(self, source=(0, 0)):
+        """Return the number of moves from source to every Cell, indexed as
+        distances[i][j] for column i and row j like the Maze Cells, -1 for
+        Cells which can't be reached
+
+        This is a Breadth-First search over the whole Maze which expands one
+        layer, i.e., all Cells at the same distance, at a time. With the
+        "numpy" backend large layers are expanded with vectorized operations
+        on the index arrays of their Cells, and a NumPy array is returned.
+
+        Raises ValueError if source is outside of the Maze.
+        """
+
+        source_i, source_j = source
+        if not (0 <= source_i < self.num_cols and
+                0 <= source_j < self.num_rows):
+            raise ValueError(f"Cell {source} is outside of the Maze")
+        num_cols = self.num_cols
+        passages = self._passages()
+        source_index = source_j * num_cols + source_i
+        if self.backend == "numpy":
+            return self._numpy_distance_field(passages, source_index)
+
+        moves = self._moves()
+        distances = [-1] * len(passages)
+        distances[source_index] = 0
+        layer, distance = [source_index], 0
+        while layer:
+            distance += 1
+            next_layer = []
+            for index in layer:
+                for offset in moves[passages[index]]:
+                    if distances[index + offset] < 0:
+                        distances[index + offset] = distance
+                        next_layer.append(index + offset)
+            layer = next_layer
+        return [distances[i::num_cols] for i in range(num_cols)]
+
+    def _numpy_distance_field(self, passages, source_index):
+        """Maze.distance_field using NumPy
+
+        Large layers are expanded with a handful of operations on arrays of
+        Cell indices, whereas small ones, e.g., along the corridors of the
+        Maze, are expanded Cell by Cell like the pure Python version, as NumPy
+        calls cost more than they save on a few Cells.
+        """
+
+        import numpy as np
+
+        moves = self._moves()
+        steps = ((LEFT, -1), (TOP, -self.num_cols),
+                 (RIGHT, 1), (BOTTOM, self.num_cols))
+        array_passages = np.frombuffer(passages, dtype=np.uint8)
+        distances = np.full(len(passages), -1, dtype=np.int32)
+        # reads and writes single Cells as fast as a list
+        cell_distances = memoryview(distances)
+        cell_distances[source_index] = 0
+        layer, distance = [source_index], 0
+        while len(layer):
+            distance += 1
+            if len(layer) < _ARRAY_LAYER_SIZE:
+                next_layer = []
+                for index in layer:
+                    for offset in moves[passages[index]]:
+                        if cell_distances[index + offset] < 0:
+                            cell_distances[index + offset] = distance
+                            next_layer.append(index + offset)
+                layer = next_layer
+                continue
+            layer = np.asarray(layer, dtype=np.intp)
+            layer_passages = array_passages[layer]
+            reached = np.concatenate([
+                layer[layer_passages & bit != 0] + offset
+                for bit, offset in steps])
+            reached = reached[distances[reached] < 0]
+            # Cells reached from several Cells of the layer, which only
+            # happens when the Maze has loops, are kept once: every Cell is
+            # first tagged with its last position in reached, which only
+            # that position then matches
+            tags = -2 - np.arange(len(reached), dtype=np.int32)
+            distances[reached] = tags
+            reached = reached[distances[reached] == tags]
+            distances[reached] = distance
+            layer = reached if len(reached) >= _ARRAY_LAYER_SIZE else\
+                reached.tolist()
+        return distances.reshape(self.num_rows, self.num_cols).T
+
+    def _moves(self) -> list[tuple[int, ...]]:
+        """Return, for every possible passages byte of Maze._passages, the
+        offsets to add to a Cell index to get the index of each Cell it leads
+        to, in the same order as Maze._get_neighbours"""
+
+        return [tuple(offset for bit, offset in (
+            (LEFT, -1), (TOP, -self.num_cols),
+            (RIGHT, 1), (BOTTOM, self.num_cols)) if passages & bit)
+            for passages in range(16)]
+
+    def solve(self, strategy="dfs", start=(0, 0), goal=None,
+              draw=False) -> list:
+        """Solve the Maze iteratively using the given search strategy
+
+        Available strategies are "bfs", "dfs", "astar" and "bidirectional"
+        (see the solvers module). "astar" uses the Manhattan distance to goal
+        as its heuristic. "corridor" runs solvers.bidirectional_dijkstra on the
+        graph.JunctionGraph of the Maze, see Maze.junction_graph, where every
+        corridor is a single edge, so long corridors cost a single step rather
+        than one per Cell, and solving takes time proportional to the number
+        of junctions once the graph is built.
+        goal defaults to the end Cell, i.e., _cells[-1][-1].
+
+        If draw is True, the solution path is drawn on the canvas, and for
+        "dfs" every move and backtracked move is drawn as it happens, just like
+        Maze._solve_r.
+
+        Returns the solution path as a list of (i, j) Cell coordinates from
+        start to goal, or an empty list if there's no solution.
+
+        Raises ValueError for an unknown strategy, or if start or goal is
+        outside of the Maze.
+        """
+
+        for event in self.iter_solve(strategy, start, goal):
+            if event[0] == "path":
+                return event[1]
+            if draw:
+                self.draw_event(event)
+        return []
+
+    def iter_solve(self, strategy="dfs", start=(0, 0), goal=None):
+        """Solve the Maze iteratively, one step at a time
+
+        This returns a generator of the events of the given search strategy
+        (see the solvers module) without drawing anything. Every strategy but
+        "dfs", which walks the Maze as it searches, follows up with a "move"
+        event along each step of the solution path once found. The last event
+        is always ("path", path) with the solution path as returned by
+        Maze.solve. The "explore" events of "corridor" go from junction to
+        junction, skipping the corridors in between.
+
+        Raises ValueError for an unknown strategy, or if start or goal is
+        outside of the Maze.
+        """
+
+        if goal is None:
+            goal = (len(self._cells) - 1, len(self._cells[0]) - 1)
+        if strategy not in ("dfs", "bfs", "astar", "bidirectional",
+                            "corridor"):
+            raise ValueError(f"Unknown solve strategy: {strategy}")
+
+        # solvers work on Cell indices rather than (i, j) tuples, so moving
+        # on is a lookup in the passages index plus an addition
+        num_cols = self.num_cols
+        moves = self._moves()
+        if isinstance(self._cells, NibbleGrid) and strategy != "corridor":
+            passages_of = self._lazy_passages()
+
+            def neighbours(index):
+                return [index + offset for offset in moves[passages_of(index)]]
+        else:
+            passages = self._passages()
+
+            def neighbours(index):
+                return [index + offset for offset in moves[passages[index]]]
+
+        start_index = self._cell_index(start)
+        goal_index = self._cell_index(goal)
+        if strategy == "corridor":
+            graph = self.junction_graph().spliced((start_index, goal_index))
+            search = graph.expanded(solvers.bidirectional_dijkstra(
+                self._counted(graph.neighbours), start_index, goal_index))
+            return self._iter_search(search, True)
+        neighbours = self._counted(neighbours)
+        if strategy == "dfs":
+            search = solvers.dfs(neighbours, start_index, goal_index)
+        elif strategy == "bfs":
+            search = solvers.bfs(neighbours, start_index, goal_index)
+        elif strategy == "astar":
+            goal_i, goal_j = goal
+            search = solvers.astar(
+                neighbours, start_index, goal_index,
+                lambda index: abs(goal_i - index % num_cols) +
+                abs(goal_j - index // num_cols))
+        else:
+            search = solvers.bidirectional(
+                neighbours, start_index, goal_index)
+        return self._iter_search(search, strategy != "dfs")
+
+    def _counted(self, neighbours):
+        """Wrap the neighbours function of a solver to count every node
+        expanded, if instrumented"""
+
+        if self.stats is None:
+            return neighbours
+        count = self.stats.count
+
+        def counted(node):
+            count("nodes_expanded")
+            return neighbours(node)
+
+        return counted
+
+    def _iter_search(self, search, walk_path):
+        """Yield the events of a solvers search generator over Cell indices
+        with (i, j) Cell coordinates instead, followed by the "move" events
+        along the solution path if walk_path is True, and the final "path"
+        event"""
+
+        num_cols = self.num_cols
+        while True:
+            try:
+                event = next(search)
+            except StopIteration as done:
+                path = [(index % num_cols, index // num_cols)
+                        for index in done.value]
+                break
+            kind, from_index, to_index = event[:3]
+            if kind == "move" and event[3] and self.stats is not None:
+                self.stats.count("backtracks")
+            yield (kind, (from_index % num_cols, from_index // num_cols),
+                   (to_index % num_cols, to_index // num_cols)) + event[3:]
+        if walk_path:
+            for from_cell, to_cell in zip(path, path[1:]):
+                yield ("move", from_cell, to_cell, False)
+        yield ("path", path)
+
+    def draw_event(self, event) -> None:
+        """Draw a single event of Maze.iter_break_walls or Maze.iter_solve
+
+        - "carve" redraws both Cells on either side of the broken wall
+        - "move" draws the move between both Cells, in undo color if it's a
+          backtracked move
+        - any other event isn't drawn
+        """
+
+        if event[0] == "carve":
+            _, i, j, to_i, to_j = event
+            self._draw_cell(self._cells[i][j], i, j)
+            self._draw_cell(self._cells[to_i][to_j], to_i, to_j)
+        elif event[0] == "move":
+            self._draw_move(event[1], event[2], event[3])
+        return
+
+    def _draw_move(self, from_cell, to_cell, undo=False) -> None:
+        """Draw a move between the Cells at from_cell and to_cell (i, j)
+        coordinates and animate it"""
+
+        if not self.render:
+            return
+        from_i, from_j = from_cell
+        to_i, to_j = to_cell
+        self._cells[from_i][from_j].draw_move(self._cells[to_i][to_j], undo)
+        self._animate(0.05)
+        return
+
     def _solve(self) -> bool:
-        """Solve the Maze by invoking Maze._solve_r at 0, 0 as input
+        """Solve the Maze by invoking Maze.solve with "dfs" strategy from 0, 0
+        and drawing the moves
 
-        Returns the same boolean value as received from Maze._solve_r
+        Returns True if a solution was found else False
         """
 
-        self._reset_cells_visited()
-        return self._solve_r(0, 0)
+        return len(self.solve("dfs", draw=True)) > 0
 
     def _solve_r(self, i, j) -> bool:
         """Solve the Maze recursively using Depth-First search algorithm
@@ -312,9 +988,14 @@ class Maze():
             return False
 
     def _animate(self, time=0.02) -> None:
-        """Redraw the graphics.Window with a delay to visualise drawing"""
-
-        if self._win:
-            self._win.redraw()
-            sleep(time)
+        """Report a drawing operation to the graphics.Window along with the
+        delay to visualise it, the Window decides when to actually redraw"""
+
+        if not (self._win and self.render):
+            return
+        if self.stats is None:
+            self._win.animate(time)
+            return
+        with self.stats.timer("animate"):
+            self._win.animate(time)
         return
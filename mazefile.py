@@ -0,0 +1,141 @@
+from grid import NibbleGrid, ALL_WALLS
+from maze import Maze
+import mmap
+import struct
+
+# A maze file starts with a HEADER holding:
+# - the MAGIC bytes and the format VERSION
+# - flags, HAS_SEED being set if the seed is known
+# - num_rows and num_cols
+# - seed, or 0 if unknown
+# - name of the generation algorithm, NUL padded, or empty if unknown
+# followed by num_rows rows of (num_cols + 1) // 2 bytes each, holding the
+# walls of two cells per byte, see grid.NibbleGrid.
+MAGIC = b"MAZE"
+VERSION = 1
+HAS_SEED = 1
+HEADER = struct.Struct("<4sBBQQq16s18x")
+# range of the seeds which fit in a HEADER
+SEED_MIN, SEED_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+def save(maze, path) -> None:
+    """Save the walls of every Cell of maze to a maze file at path, along with
+    its seed and generation algorithm
+
+    Raises ValueError if the seed of maze doesn't fit in a maze file, before
+    creating the file.
+    """
+
+    header = pack_header(maze.num_cols, maze.num_rows, maze.seed,
+                         maze.algorithm)
+    with open(path, "wb") as out:
+        out.write(header)
+        write_rows((maze._cells.row_walls(j) for j in range(maze.num_rows)),
+                   out)
+    return
+
+
+def pack_header(num_cols, num_rows, seed=None, algorithm=None) -> bytes:
+    """Return the header of a maze file
+
+    Raises ValueError if seed is out of the SEED_MIN to SEED_MAX range, so
+    callers can check it before opening the file to write the header to.
+    """
+
+    if seed is not None and not SEED_MIN <= seed <= SEED_MAX:
+        raise ValueError(f"Seed {seed} doesn't fit in a maze file, it must be "
+                         f"between {SEED_MIN} and {SEED_MAX}")
+    return HEADER.pack(
+        MAGIC,
+        VERSION,
+        HAS_SEED if seed is not None else 0,
+        num_rows,
+        num_cols,
+        seed if seed is not None else 0,
+        (algorithm or "").encode("ascii"))
+
+
+def write_rows(rows, out) -> int:
+    """Write rows of walls, e.g., as yielded by stream.iter_rows, to the out
+    binary stream after pack_header, one row at a time
+
+    Returns the number of rows written.
+    """
+
+    count = 0
+    for row in rows:
+        out.write(_pack_row(row))
+        count += 1
+    return count
+
+
+def read_header(f) -> tuple[int, int, int | None, str | None]:
+    """Read the header of a maze file from the f binary stream
+
+    Returns num_cols, num_rows, seed and algorithm, the last two being None if
+    unknown.
+
+    Raises ValueError if f isn't a maze file of a supported version.
+    """
+
+    header = f.read(HEADER.size)
+    if len(header) != HEADER.size:
+        raise ValueError("Not a maze file: header is truncated")
+    magic, version, flags, num_rows, num_cols, seed, algorithm =\
+        HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("Not a maze file: bad magic bytes")
+    if version != VERSION:
+        raise ValueError(f"Unsupported maze file version: {version}")
+    algorithm = algorithm.rstrip(b"\0").decode("ascii") or None
+    return num_cols, num_rows, seed if flags & HAS_SEED else None, algorithm
+
+
+def load(path, x1=0, y1=0, cell_size_x=1, cell_size_y=1, win=None,
+         render=False) -> Maze:
+    """Load a Maze from the maze file at path
+
+    The file is memory-mapped rather than read, so loading takes the same time
+    whatever the size of the maze, and only the parts of the file the Maze
+    actually touches are paged in. Solving reads the walls of the rows the
+    search reaches, one row at a time, except with the "corridor" strategy
+    which, like other queries of the whole Maze, e.g., Maze.distance_field,
+    Maze.junction_graph or Maze.path, reads every row once. The mapping is
+    copy-on-write, so changing the walls of the Maze never changes the file.
+
+    The remaining arguments are passed on to Maze, and the Maze is headless by
+    default.
+
+    Raises ValueError if path isn't a complete maze file of a supported version.
+    """
+
+    with open(path, "rb") as f:
+        num_cols, num_rows, seed, algorithm = read_header(f)
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    if len(buffer) < HEADER.size + num_rows * ((num_cols + 1) // 2):
+        buffer.close()
+        raise ValueError("Not a maze file: rows are truncated")
+    grid = NibbleGrid(buffer, HEADER.size, num_cols, num_rows,
+                      (x1, y1, cell_size_x, cell_size_y), win)
+    maze = Maze(x1, y1, num_rows, num_cols, cell_size_x, cell_size_y, win,
+                render=render, grid=grid, seed=seed)
+    maze.algorithm = algorithm
+    return maze
+
+
+# translation tables moving the walls of a cell to the low or high nibble
+_PACK_LOW = bytes(b & ALL_WALLS for b in range(256))
+_PACK_HIGH = bytes((b & ALL_WALLS) << 4 for b in range(256))
+
+
+def _pack_row(row) -> bytes:
+    """Pack a row of walls bitmasks two cells per byte, even cells in the low
+    nibble and odd cells in the high nibble"""
+
+    stride = (len(row) + 1) // 2
+    low = bytes(row[0::2]).translate(_PACK_LOW)
+    high = bytes(row[1::2]).translate(_PACK_HIGH)
+    # both halves never overlap, so OR-ing them as integers merges every byte
+    return (int.from_bytes(low, "little") |
+            int.from_bytes(high, "little")).to_bytes(stride, "little")
@@ -0,0 +1,345 @@
+from grid import LEFT, TOP, RIGHT, BOTTOM
+import re
+import struct
+import zlib
+
+# palette indices of the pixels of a Raster
+BACKGROUND = 0
+WALL = 1
+PATH = 2
+# colors of the palette indices, matching the colors drawn on a Window
+PALETTE = ((255, 255, 255), (0, 0, 0), (255, 0, 0))
+
+# translation tables turning the walls of every Cell of a row into 1 if the
+# given wall exists, else 0
+_HAS_WALL = {wall: bytes(int(bool(b & wall)) for b in range(256))
+             for wall in (LEFT, TOP, RIGHT, BOTTOM)}
+
+
+class Raster():
+    """Image of a Maze as rows of palette indices
+
+    Attributes
+    ----------
+    width : int
+        number of pixels per row.
+    height : int
+        number of rows.
+    pixels : bytearray
+        PALETTE index of every pixel, row after row.
+    palette : tuple[tuple[int, int, int], ...]
+        red, green and blue values of every palette index.
+    """
+
+    def __init__(self, width, height, palette=PALETTE) -> None:
+        """Instantiates the Raster with every pixel set to BACKGROUND"""
+
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height)
+        self.palette = palette
+        return
+
+    def pixel(self, x, y) -> int:
+        """Return the palette index of pixel at (x, y)"""
+
+        return self.pixels[y * self.width + x]
+
+    def fill(self, x1, y1, x2, y2, index) -> None:
+        """Set every pixel from (x1, y1) included to (x2, y2) excluded to the
+        palette index, clipping to the Raster"""
+
+        x1, x2 = max(x1, 0), min(x2, self.width)
+        if x1 >= x2:
+            return
+        run = bytes([index]) * (x2 - x1)
+        for y in range(max(y1, 0), min(y2, self.height)):
+            self.pixels[y * self.width + x1:y * self.width + x2] = run
+        return
+
+    def to_ppm(self) -> bytes:
+        """Return the Raster as a binary PPM image"""
+
+        rgb = bytearray(len(self.pixels) * 3)
+        for channel in range(3):
+            table = bytes(color[channel] for color in self.palette)
+            rgb[channel::3] = self.pixels.translate(
+                table + bytes(256 - len(table)))
+        header = f"P6 {self.width} {self.height} 255\n".encode("ascii")
+        return header + rgb
+
+    def to_png(self, level=1) -> bytes:
+        """Return the Raster as an indexed color PNG image, compressed with
+        the given zlib level
+
+        The default is the fastest level, as higher levels take longer than
+        rasterizing a large Maze, for images about half as big at level 6.
+        """
+
+        stride = self.width + 1
+        # every row starts with the byte of PNG filter type 0, i.e., none
+        raw = bytearray(stride * self.height)
+        for y in range(self.height):
+            raw[y * stride + 1:(y + 1) * stride] =\
+                self.pixels[y * self.width:(y + 1) * self.width]
+        # 8 bits per pixel, indexed color, no interlacing
+        header = struct.pack(
+            ">IIBBBBB", self.width, self.height, 8, 3, 0, 0, 0)
+        palette = bytes(value for color in self.palette for value in color)
+        return b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", header) +\
+            _png_chunk(b"PLTE", palette) +\
+            _png_chunk(b"IDAT", zlib.compress(raw, level)) +\
+            _png_chunk(b"IEND", b"")
+
+    def save(self, path, level=1) -> None:
+        """Save the Raster to path, as a PPM image if path ends with .ppm,
+        else as a PNG image compressed with the given zlib level"""
+
+        data = self.to_ppm() if str(path).lower().endswith(".ppm") else\
+            self.to_png(level)
+        with open(path, "wb") as out:
+            out.write(data)
+        return
+
+
+def rasterize(maze, path=None, cell_size=None, margin=None,
+              wall_width=2) -> Raster:
+    """Render the walls of maze, and the given solution path if any, without a
+    Window
+
+    Cells are laid out with Maze.cell_geometry, cell_size and margin, i.e.,
+    the origin of the Maze, defaulting to the ones of the Maze. The margin is
+    kept on all sides, and is at-least the wall width. A wall is drawn only
+    where it blocks moving between both Cells, i.e., like Maze._is_not_blocked.
+
+    Rather than drawing every wall on its own, every row of pixels between
+    two rows of Cells is built once from the walls of the whole row, with
+    byte level operations, and copied as a block, so rendering takes a
+    couple of Python operations per row of Cells rather than per Cell.
+
+    path is a list of (i, j) Cell coordinates, e.g., as returned by
+    Maze.solve, drawn through the centers of its Cells. It gets the same
+    lines through the entrance and exit as Maze._draw_start_line and
+    Maze._draw_end_line when it goes from the first to the last Cell.
+
+    Returns the Raster, with the size of the Maze plus margins.
+    """
+
+    num_cols, num_rows = maze.num_cols, maze.num_rows
+    if margin is None:
+        margin = (maze.x1, maze.y1)
+    origin = (max(margin[0], wall_width), max(margin[1], wall_width))
+    if cell_size is None:
+        cell_size = (maze.cell_size_x, maze.cell_size_y)
+    cell_size = (max(int(cell_size[0]), wall_width),
+                 max(int(cell_size[1]), wall_width))
+    ox, oy, _, _ = maze.cell_geometry(0, 0, origin, cell_size)
+    _, _, right, bottom = maze.cell_geometry(
+        num_cols - 1, num_rows - 1, origin, cell_size)
+    size_x, size_y = cell_size
+    raster = Raster(right + ox, bottom + oy)
+    width = raster.width
+    # walls are centered on the edges of the Cells
+    shift = wall_width // 2
+    wall, blank = bytes([WALL]), bytes([BACKGROUND])
+    vertical_segments = (blank * size_x,
+                         wall * wall_width + blank * (size_x - wall_width))
+    horizontal_segments = (blank * size_x, wall * size_x)
+
+    def vertical(flags) -> bytes:
+        """Pixel row of the vertical walls of a row of Cells"""
+
+        line = blank * (ox - shift) +\
+            b"".join(map(vertical_segments.__getitem__, flags[:-1])) +\
+            (wall if flags[-1] else blank) * wall_width
+        return line + blank * (width - len(line))
+
+    def horizontal(flags, above, below) -> bytes:
+        """Pixel row of the horizontal walls between two rows of Cells,
+        including the ends of the vertical walls above and below them"""
+
+        line = blank * ox +\
+            b"".join(map(horizontal_segments.__getitem__, flags))
+        line += blank * (width - len(line))
+        for vertical_line in (above, below):
+            if vertical_line is not None:
+                line = _or(line, vertical_line)
+        return line
+
+    pixels = raster.pixels
+    above_line = None
+    for j, horizontal_flags, vertical_flags in _wall_flags(maze):
+        line = vertical(vertical_flags) if vertical_flags is not None else None
+        y = oy + j * size_y - shift
+        pixels[y * width:(y + wall_width) * width] =\
+            horizontal(horizontal_flags, above_line, line) * wall_width
+        if line is not None:
+            band = size_y - wall_width
+            pixels[(y + wall_width) * width:
+                   (y + wall_width + band) * width] = line * band
+        above_line = line
+
+    if path:
+        corners = _path_corners(maze, path, origin, cell_size)
+        for (x1, y1), (x2, y2) in zip(corners, corners[1:]):
+            x1, x2 = int(min(x1, x2)), int(max(x1, x2))
+            y1, y2 = int(min(y1, y2)), int(max(y1, y2))
+            raster.fill(x1 - shift, y1 - shift,
+                        x2 - shift + wall_width, y2 - shift + wall_width,
+                        PATH)
+    return raster
+
+
+def to_svg(maze, path=None, cell_size=None, margin=None,
+           wall_width=2) -> str:
+    """Render the walls of maze, and the given solution path if any, as an
+    SVG document
+
+    Cells are laid out and walls are drawn the same way as rasterize does,
+    except that margins are kept as is. Every run of walls along the same
+    line is merged into a single segment, and the wall between two Cells is
+    only drawn once, so all walls take a single <path> element with one
+    segment per run rather than four Lines per Cell, as Cell.draw does.
+
+    Returns the SVG document.
+    """
+
+    num_cols, num_rows = maze.num_cols, maze.num_rows
+    origin = margin or (maze.x1, maze.y1)
+    cell_size = cell_size or (maze.cell_size_x, maze.cell_size_y)
+    _, _, right, bottom = maze.cell_geometry(
+        num_cols - 1, num_rows - 1, origin, cell_size)
+    width, height = right + origin[0], bottom + origin[1]
+    size_x, size_y = cell_size
+    ox, oy = origin
+
+    segments = []
+    # y at which the current run of vertical walls along every column edge
+    # started, only looked at when walls start or stop along that edge
+    run_starts = [None] * (num_cols + 1)
+    previous_flags = bytes(num_cols + 1)
+    for j, horizontal_flags, vertical_flags in _wall_flags(maze):
+        y = oy + j * size_y
+        for run in _RUN.finditer(horizontal_flags):
+            segments.append(f"M{ox + run.start() * size_x:g} {y:g}"
+                            f"H{ox + run.end() * size_x:g}")
+        if vertical_flags is None:
+            vertical_flags = bytes(num_cols + 1)
+        changes = _xor(previous_flags, vertical_flags)
+        for change in _CHANGE.finditer(changes):
+            i = change.start()
+            if vertical_flags[i]:
+                run_starts[i] = y
+            else:
+                segments.append(f"M{ox + i * size_x:g} {run_starts[i]:g}"
+                                f"V{y:g}")
+        previous_flags = vertical_flags
+
+    lines = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}" '
+        f'height="{height:g}" viewBox="0 0 {width:g} {height:g}">',
+        f'<rect width="100%" height="100%" fill="{_svg_color(BACKGROUND)}"/>',
+        f'<path fill="none" stroke="{_svg_color(WALL)}" '
+        f'stroke-width="{wall_width}" stroke-linecap="square" '
+        f'd="{"".join(segments)}"/>',
+    ]
+    if path:
+        points = " ".join(f"{x:g},{y:g}" for x, y in
+                          _path_corners(maze, path, origin, cell_size))
+        lines.append(f'<polyline fill="none" stroke="{_svg_color(PATH)}" '
+                     f'stroke-width="{wall_width}" points="{points}"/>')
+    lines.append("</svg>")
+    return "\n".join(lines) + "\n"
+
+
+# runs of walls in the flags of _wall_flags, and differences between them
+_RUN = re.compile(b"\x01+")
+_CHANGE = re.compile(b"[^\x00]")
+
+
+def _wall_flags(maze):
+    """Generate which walls of maze are drawn, one row of Cells at a time
+
+    A wall between two Cells is drawn only when both of them have it, i.e.,
+    it blocks moving between them, whereas walls on the edges of the Maze are
+    drawn when the Cell along the edge has it.
+
+    Yields (j, horizontal, vertical) for j from 0 to num_rows, with a byte
+    per Cell, set to 1 if drawn, else 0, for:
+    - horizontal: the walls along the top of the Cells of row j, i.e., along
+      the bottom of the last row when j is num_rows
+    - vertical: the walls along the left of the Cells of row j, followed by
+      the right wall of its last Cell, or None when j is num_rows
+    """
+
+    above = None
+    for j in range(maze.num_rows):
+        walls = maze._cells.row_walls(j)
+        top = walls.translate(_HAS_WALL[TOP])
+        if above is not None:
+            top = _and(top, above.translate(_HAS_WALL[BOTTOM]))
+        left = _and(walls.translate(_HAS_WALL[LEFT]),
+                    b"\x01" + walls[:-1].translate(_HAS_WALL[RIGHT]))
+        yield j, top, left + (b"\x01" if walls[-1] & RIGHT else b"\x00")
+        above = walls
+    yield maze.num_rows, above.translate(_HAS_WALL[BOTTOM]), None
+
+
+def _path_corners(maze, path, origin, cell_size) -> list:
+    """Return the points where path, a list of (i, j) Cell coordinates, turns,
+    along with its ends
+
+    Moves along the same row or column merge into a single line. If path goes
+    from the first to the last Cell, it's extended through the entrance and
+    exit as Maze._draw_start_line and Maze._draw_end_line do.
+    """
+
+    centers = [maze.cell_center(i, j, origin, cell_size) for i, j in path]
+    if path[0] == (0, 0) and\
+            path[-1] == (maze.num_cols - 1, maze.num_rows - 1):
+        x, y = centers[0]
+        centers.insert(0, (x, y - origin[1]))
+        x, y = centers[-1]
+        centers.append((x, y + origin[1]))
+    corners = [centers[0]]
+    for previous, center, following in zip(centers, centers[1:],
+                                           centers[2:]):
+        if not (previous[0] == center[0] == following[0] or
+                previous[1] == center[1] == following[1]):
+            corners.append(center)
+    corners.append(centers[-1])
+    return corners
+
+
+def _svg_color(index) -> str:
+    """Return the color of the palette index as an SVG color"""
+
+    return "#{:02x}{:02x}{:02x}".format(*PALETTE[index])
+
+
+def _and(a, b) -> bytes:
+    """AND two byte strings of the same length, byte by byte"""
+
+    return (int.from_bytes(a, "little") &
+            int.from_bytes(b, "little")).to_bytes(len(a), "little")
+
+
+def _or(a, b) -> bytes:
+    """OR two byte strings of the same length, byte by byte"""
+
+    return (int.from_bytes(a, "little") |
+            int.from_bytes(b, "little")).to_bytes(len(a), "little")
+
+
+def _xor(a, b) -> bytes:
+    """XOR two byte strings of the same length, byte by byte"""
+
+    return (int.from_bytes(a, "little") ^
+            int.from_bytes(b, "little")).to_bytes(len(a), "little")
+
+
+def _png_chunk(kind, data) -> bytes:
+    """Return a PNG chunk of the given 4 letter kind holding data"""
+
+    return struct.pack(">I", len(data)) + kind + data +\
+        struct.pack(">I", zlib.crc32(kind + data))
@@ -3,11 +3,16 @@ from setuptools import setup
 setup(
     name='maniac_maze_solver',
     version='0.1',
-    py_modules=['main'],
+    py_modules=['main', 'maze', 'cell', 'graphics', 'solvers', 'grid',
+                'generators', 'stream', 'mazefile', 'batch',
+                'bench', 'stats', 'render', 'graph', 'lca'],
     install_requires=[
         'click',
         'pytest',
     ],
+    extras_require={
+        'numpy': ['numpy'],
+    },
     entry_points='''
         [console_scripts]
         mms=main:main
@@ -0,0 +1,212 @@
+from collections import deque
+import heapq
+
+# Every solver is a generator taking neighbours(node), which returns the nodes
+# reachable from node in one move, along with the start and goal nodes. While
+# searching it yields events:
+# - ("move", from_node, to_node, undo) when walking from one node to the next,
+#   undo being True when backtracking
+# - ("explore", from_node, to_node) when to_node is first reached from from_node
+#   without walking there
+# and once done it returns the solution path, i.e., the list of nodes from start
+# to goal, or an empty list if goal can't be reached. Use solve to just get the
+# path. Solvers of weighted graphs take edges(node) instead, which returns
+# (to_node, cost) pairs.
+
+
+def solve(search) -> list:
+    """Run the search generator of any solver to completion and return its
+    solution path"""
+
+    while True:
+        try:
+            next(search)
+        except StopIteration as done:
+            return done.value
+
+
+def dfs(neighbours, start, goal):
+    """Solve using iterative Depth-First search
+
+    This walks the maze the same way Maze._solve_r does, but keeps the current
+    path and an iterator over each path Cell's neighbours on explicit stacks
+    instead of the Python call stack.
+
+    Yields a "move" event for every move forward and for every backtracked
+    move.
+    """
+
+    if start == goal:
+        return [start]
+    visited = {start}
+    path = [start]
+    stack = [iter(neighbours(start))]
+    while stack:
+        node = path[-1]
+        for to_node in stack[-1]:
+            if to_node not in visited:
+                break
+        else:
+            stack.pop()
+            path.pop()
+            if path:
+                yield ("move", node, path[-1], True)
+            continue
+        visited.add(to_node)
+        yield ("move", node, to_node, False)
+        path.append(to_node)
+        if to_node == goal:
+            return path
+        stack.append(iter(neighbours(to_node)))
+    return []
+
+
+def bfs(neighbours, start, goal):
+    """Solve using Breadth-First search
+
+    Yields an "explore" event for every node reached, and returns the shortest
+    path.
+    """
+
+    parents = {start: None}
+    frontier = deque([start])
+    while frontier:
+        node = frontier.popleft()
+        if node == goal:
+            return _build_path(parents, goal)
+        for to_node in neighbours(node):
+            if to_node not in parents:
+                parents[to_node] = node
+                yield ("explore", node, to_node)
+                frontier.append(to_node)
+    return []
+
+
+def astar(neighbours, start, goal, heuristic):
+    """Solve using A* search with unit cost moves
+
+    heuristic(node) must never over-estimate the number of moves from node to
+    goal for the returned path to be the shortest one.
+
+    Yields an "explore" event every time a shorter way to a node is found.
+    """
+
+    parents = {start: None}
+    costs = {start: 0}
+    # the counter breaks ties so nodes themselves are never compared
+    counter = 0
+    frontier = [(heuristic(start), counter, start)]
+    while frontier:
+        _, _, node = heapq.heappop(frontier)
+        if node == goal:
+            return _build_path(parents, goal)
+        cost = costs[node] + 1
+        for to_node in neighbours(node):
+            if cost < costs.get(to_node, cost + 1):
+                costs[to_node] = cost
+                parents[to_node] = node
+                yield ("explore", node, to_node)
+                counter += 1
+                heapq.heappush(
+                    frontier, (cost + heuristic(to_node), counter, to_node))
+    return []
+
+
+def bidirectional(neighbours, start, goal):
+    """Solve using Breadth-First search from both start and goal
+
+    Both searches advance one whole level at a time, always expanding the
+    smaller frontier, and stop as soon as they meet. Moves are expected to be
+    reversible, i.e., a is in neighbours(b) whenever b is in neighbours(a).
+
+    Yields an "explore" event for every node reached by either search, and
+    returns the shortest path.
+    """
+
+    if start == goal:
+        return [start]
+    forward, backward = {start: None}, {goal: None}
+    forward_frontier, backward_frontier = [start], [goal]
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            parents, others, frontier = forward, backward, forward_frontier
+        else:
+            parents, others, frontier = backward, forward, backward_frontier
+        next_frontier = []
+        for node in frontier:
+            for to_node in neighbours(node):
+                if to_node in parents:
+                    continue
+                parents[to_node] = node
+                yield ("explore", node, to_node)
+                if to_node in others:
+                    return _build_path(forward, to_node)[:-1] +\
+                        _build_path(backward, to_node)[::-1]
+                next_frontier.append(to_node)
+        if parents is forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+    return []
+
+
+def bidirectional_dijkstra(edges, start, goal):
+    """Solve a weighted graph using Dijkstra's algorithm from both start and
+    goal
+
+    Each step settles the closest node of the search whose closest node is
+    nearer, and both searches stop once the sum of the costs of their closest
+    nodes reaches the cost of the best path through a node reached by both.
+    Edges are expected to be reversible at the same cost, and costs to never
+    be negative.
+
+    Yields an "explore" event every time a cheaper way to a node is found by
+    either search, and returns the cheapest path.
+    """
+
+    if start == goal:
+        return [start]
+    costs = ({start: 0}, {goal: 0})
+    parents = ({start: None}, {goal: None})
+    # the counter breaks ties so nodes themselves are never compared
+    counter = 0
+    frontiers = ([(0, counter, start)], [(0, counter, goal)])
+    best, meeting = None, None
+    while frontiers[0] and frontiers[1]:
+        forward_cost, backward_cost = frontiers[0][0][0], frontiers[1][0][0]
+        if best is not None and forward_cost + backward_cost >= best:
+            break
+        side = 0 if forward_cost <= backward_cost else 1
+        node_costs, others = costs[side], costs[1 - side]
+        cost, _, node = heapq.heappop(frontiers[side])
+        if cost > node_costs[node]:
+            # a cheaper way was found since it was pushed
+            continue
+        for to_node, edge_cost in edges(node):
+            to_cost = cost + edge_cost
+            if to_cost >= node_costs.get(to_node, to_cost + 1):
+                continue
+            node_costs[to_node] = to_cost
+            parents[side][to_node] = node
+            yield ("explore", node, to_node)
+            counter += 1
+            heapq.heappush(frontiers[side], (to_cost, counter, to_node))
+            if to_node in others and\
+                    (best is None or to_cost + others[to_node] < best):
+                best, meeting = to_cost + others[to_node], to_node
+    if meeting is None:
+        return []
+    return _build_path(parents[0], meeting)[:-1] +\
+        _build_path(parents[1], meeting)[::-1]
+
+
+def _build_path(parents, node) -> list:
+    """Follow the parents mapping back from node to build the path ending at
+    node"""
+
+    path = []
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    path.reverse()
+    return path
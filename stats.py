@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+from time import perf_counter
+
+# counters reported even when nothing was counted
+COUNTERS = ("cells_drawn", "walls_broken", "nodes_expanded", "backtracks",
+            "canvas_items")
+
+
+class MazeStats():
+    """Counters and timers of the operations of a Maze and its Window
+
+    An instance is passed to Maze and graphics.Window to opt in, which then
+    count:
+    - cells_drawn: Cells drawn with Maze._draw_cell
+    - walls_broken: walls broken while generating the Maze, both sides of the
+      wall between two Cells counting as one
+    - nodes_expanded: Cells, or junctions for the "corridor" solver, whose
+      neighbours a solver looked up
+    - backtracks: moves backtracked by the "dfs" solver
+    - canvas_items: items created on the canvas of the Window
+    and time:
+    - animate: Maze._animate, including any wait for a frame
+    - wait: graphics.Window.wait, i.e., waiting for a frame to be shown
+    - work: handling events in between the frames of graphics.Window.play
+    Timers nest, e.g., a Window.wait within Maze._animate counts towards both.
+
+    Attributes
+    ----------
+    counts : dict[str, int]
+        value of every counter by name.
+    timings : dict[str, float]
+        total number of seconds spent in every timer by name.
+    started : float
+        time.perf_counter when counting started.
+    """
+
+    def __init__(self) -> None:
+        """Instantiates the MazeStats with every counter at 0 and no time
+        spent"""
+
+        self.reset()
+        return
+
+    def reset(self) -> None:
+        """Zero every counter and timer, and restart the elapsed time"""
+
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        self.timings = {}
+        self.started = perf_counter()
+        return
+
+    def count(self, name, n=1) -> None:
+        """Add n to the counter name"""
+
+        self.counts[name] = self.counts.get(name, 0) + n
+        return
+
+    @contextmanager
+    def timer(self, name):
+        """Context manager adding the time spent within it to the timer name
+        """
+
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) +\
+                perf_counter() - started
+
+    def elapsed(self) -> float:
+        """Number of seconds since counting started"""
+
+        return perf_counter() - self.started
+
+    def as_dict(self) -> dict:
+        """Return the counters, timers and elapsed time as a dict"""
+
+        return {
+            "counts": dict(self.counts),
+            "timings": dict(self.timings),
+            "elapsed": self.elapsed(),
+        }
+
+    def report(self) -> str:
+        """Return a human readable summary, with the share of the elapsed time
+        spent in every timer"""
+
+        elapsed = self.elapsed()
+        lines = [f"{name:>16}: {value}" for name, value in self.counts.items()]
+        for name, seconds in self.timings.items():
+            share = seconds / elapsed * 100 if elapsed else 0.0
+            lines.append(f"{name:>16}: {seconds:.3f}s ({share:.1f}%)")
+        lines.append(f"{'elapsed':>16}: {elapsed:.3f}s")
+        return "\n".join(lines)
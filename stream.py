@@ -0,0 +1,84 @@
+from generators import eller_rows, sidewinder_rows
+from grid import LEFT, TOP, RIGHT, BOTTOM, ALL_WALLS
+import random
+
+# row generators which never look back further than the previous row
+ROW_ALGORITHMS = ("eller", "sidewinder")
+
+
+def iter_rows(num_cols, num_rows, algorithm="eller", rng=random):
+    """Generate a perfect maze row after row without ever holding the whole
+    maze
+
+    The entrance, i.e., top wall of the first Cell, and the exit, i.e., bottom
+    wall of the last Cell, are broken just like Maze._break_entrance_and_exit
+    does. Only the current and previous rows are kept, so memory only depends
+    on num_cols.
+
+    Yields a bytearray for every row with the walls of each of its Cells as a
+    bitmask of grid.LEFT, grid.TOP, grid.RIGHT and grid.BOTTOM.
+    """
+
+    if algorithm == "eller":
+        rows = _up_from_down(eller_rows(num_cols, num_rows, rng))
+    elif algorithm == "sidewinder":
+        rows = sidewinder_rows(num_cols, num_rows, rng)
+    else:
+        raise ValueError(f"Unknown row generation algorithm: {algorithm}")
+
+    previous = None
+    for right, up in rows:
+        row = bytearray([ALL_WALLS]) * num_cols
+        for i, carved in enumerate(right):
+            if carved:
+                row[i] &= ~RIGHT
+                row[i + 1] &= ~LEFT
+        for i, carved in enumerate(up):
+            if carved:
+                row[i] &= ~TOP
+                previous[i] &= ~BOTTOM
+        if previous is None:
+            row[0] &= ~TOP
+        else:
+            yield previous
+        previous = row
+    if previous is not None:
+        previous[-1] &= ~BOTTOM
+        yield previous
+
+
+def _up_from_down(rows):
+    """Turn the (right, down) rows of generators.eller_rows into (right, up)
+    rows as of generators.sidewinder_rows"""
+
+    up = None
+    for right, down in rows:
+        yield right, up or []
+        up = down
+
+
+def write_text(rows, out) -> int:
+    """Write rows of walls, as yielded by iter_rows, to the out text stream as
+    ASCII art, one row at a time
+
+    Every Cell is drawn over two lines and three characters, e.g., a 1 by 2
+    maze with the entrance and exit broken is written as:
+
+        +  +--+
+        |     |
+        +--+  +
+
+    Returns the number of rows written.
+    """
+
+    count = 0
+    for row in rows:
+        if count == 0:
+            out.write("+" + "".join(
+                "--+" if walls & TOP else "  +" for walls in row) + "\n")
+        out.write(("|" if row[0] & LEFT else " ") + "".join(
+            "  |" if walls & RIGHT else "   " for walls in row) + "\n")
+        out.write("+" + "".join(
+            "--+" if walls & BOTTOM else "  +" for walls in row) + "\n")
+        count += 1
+    return count
@@ -1,6 +1,42 @@
 from cell import Cell
-from graphics import Point, Line
+from graphics import FrameScheduler, Point, Line, SharedGeometry
+from grid import NibbleGrid, PackedGrid, LEFT, TOP, RIGHT, BOTTOM, ALL_WALLS
+from generators import ALGORITHMS, eller_rows
+from graph import JunctionGraph
+from lca import LCAIndex
 from maze import Maze
+from stats import MazeStats
+import batch
+import bench
+import io
+import json
+import mazefile
+import pytest
+import random
+import render
+import solvers
+import stream
+import zlib
+
+
+class FakeWindow():
+    """Stands in for graphics.Window to count canvas items without a display
+    """
+
+    background = "white"
+
+    def __init__(self):
+        self.items = {}
+
+    def draw_line(self, line, fill_color="black"):
+        self.items[len(self.items) + 1] = fill_color
+        return len(self.items)
+
+    def recolor_line(self, item, fill_color="black"):
+        self.items[item] = fill_color
+
+    def animate(self, delay=0.0):
+        pass
 
 
 class TestCellClass():
@@ -116,6 +152,37 @@ class TestCellClass():
         expected_repr = f"""{x1}, {y1} {x2}, {y2} True True True True"""
         assert repr(c) == expected_repr
 
+    def test_cell_redraw_reuses_lines(self):
+        win = FakeWindow()
+        c = Cell(win)
+        c.draw(0, 0, 10, 10)
+        assert c._line_ids == [1, 2, 3, 4]
+        c.has_top_wall = False
+        c.draw(0, 0, 10, 10)
+        assert len(win.items) == 4
+        assert win.items[2] == "white"
+
+    def test_cell_redraw_moved(self):
+        win = FakeWindow()
+        c = Cell(win)
+        c.draw(0, 0, 10, 10)
+        c.draw(10, 0, 20, 10)
+        assert c._line_ids == [5, 6, 7, 8]
+
+    def test_cell_draw_shared_geometry(self):
+        geometry = SharedGeometry()
+        c1, c2 = Cell(), Cell()
+        c1.draw(0, 0, 10, 10, geometry=geometry)
+        c2.draw(10, 0, 20, 10, geometry=geometry)
+        assert c1.right_line is c2.left_line
+        assert c1.top_line.p2 is c2.top_line.p1
+        assert c1.left_line == Line(Point(0, 0), Point(0, 10))
+        assert c2.bottom_line == Line(Point(10, 10), Point(20, 10))
+
+    def test_cell_slots(self):
+        with pytest.raises(AttributeError):
+            Cell().colour = "black"
+
 
 class TestPointClass():
 
@@ -128,6 +195,21 @@ class TestPointClass():
         assert Point(0, 0) == Point(0, 0)
         assert Point(0, 1) != Point(0, 0)
 
+    def test_point_hash(self):
+        assert hash(Point(3, 4)) == hash(Point(3, 4))
+        assert len({Point(3, 4), Point(3, 4), Point(4, 3)}) == 2
+        assert not hasattr(Point(3, 4), "__dict__")
+
+    def test_shared_geometry(self):
+        geometry = SharedGeometry()
+        p = geometry.point(3, 4)
+        assert geometry.point(3, 4) is p
+        assert geometry.point(4, 3) is not p
+        line = geometry.line(p, geometry.point(3, 8))
+        assert geometry.line(Point(3, 4), Point(3, 8)) is line
+        geometry.clear()
+        assert geometry.point(3, 4) is not p
+
 
 class TestLineClass():
     def test_line_constructor(self):
@@ -136,6 +218,83 @@ class TestLineClass():
         assert p.p2 == Point(0, 1)
 
 
+class TestPackedGridClass():
+
+    def test_packed_grid_constructor(self):
+        g = PackedGrid(12, 10)
+        assert len(g) == 12
+        assert len(g[0]) == 10
+        assert len(g._data) == 120
+        assert g.walls(11, 9) == ALL_WALLS
+        assert not g.is_visited(11, 9)
+
+    def test_packed_grid_break_wall(self):
+        g = PackedGrid(12, 10)
+        g.break_wall(3, 4, LEFT)
+        g.break_wall(3, 4, BOTTOM)
+        assert g.walls(3, 4) == TOP | RIGHT
+        assert not g[3][4].has_left_wall
+        assert not g[-9][-6].has_bottom_wall
+        assert g[3][4].has_top_wall
+
+    def test_packed_grid_cell_view(self):
+        g = PackedGrid(12, 10, (9, 8, 11, 13))
+        c = g[2][3]
+        c.has_right_wall = False
+        c.visited = True
+        assert g.walls(2, 3) == LEFT | TOP | BOTTOM
+        assert g.is_visited(2, 3)
+        assert g[2][3].get_center() == (9 + 2 * 11 + 5.5, 8 + 3 * 13 + 6.5)
+        assert repr(g[2][3]).endswith("True True False True")
+
+    def test_packed_grid_reset_visited(self):
+        g = PackedGrid(12, 10)
+        g.set_visited(1, 1)
+        g.break_wall(1, 1, TOP)
+        g.reset_visited()
+        assert not g.is_visited(1, 1)
+        assert g.walls(1, 1) == LEFT | RIGHT | BOTTOM
+
+    def test_packed_grid_index_error(self):
+        g = PackedGrid(12, 10)
+        with pytest.raises(IndexError):
+            g[12]
+        with pytest.raises(IndexError):
+            g[0][10]
+
+
+class TestFrameSchedulerClass():
+
+    def test_frame_scheduler_coalesces_instant_ops(self):
+        frames, waits = [], []
+        f = FrameScheduler(lambda: frames.append(1), 0.0, fps=0.01,
+                           wait=waits.append)
+        for _ in range(100):
+            f.tick(0.02)
+        assert len(frames) == 0
+        f.flush()
+        assert len(frames) == 1
+        assert waits == []
+
+    def test_frame_scheduler_ops_per_frame(self):
+        frames = []
+        f = FrameScheduler(lambda: frames.append(1), 0.0, fps=0.01,
+                           ops_per_frame=10, wait=lambda _: None)
+        for _ in range(100):
+            f.tick()
+        assert len(frames) == 10
+
+    def test_frame_scheduler_waits_for_delay(self):
+        frames, waits = [], []
+        f = FrameScheduler(lambda: frames.append(1), 1.0, fps=10,
+                           wait=waits.append)
+        f.tick(0.06)
+        f.tick(0.06)
+        assert len(frames) == 1
+        assert len(waits) == 1
+        assert 0 < waits[0] <= 0.12
+
+
 class TestMazeClass():
     def test_maze_create_cells(self):
         num_rows, num_cols = 10, 12
@@ -198,6 +357,27 @@ class TestMazeClass():
         assert m._cells[-1][-1].visited
 #
 
+    def test_maze_break_walls(self):
+        m = Maze(9, 8, 10, 12, 11, 13)
+        m._break_entrance_and_exit()
+        assert m._break_walls(0, 0)
+        assert m._cells[-1][-1].visited
+
+    def test_maze_break_walls_matches_recursive(self):
+        m1 = Maze(9, 8, 10, 12, 11, 13, seed=42)
+        m1._break_walls_r(0, 0)
+        m2 = Maze(9, 8, 10, 12, 11, 13, seed=42)
+        m2._break_walls(0, 0)
+        assert [repr(c) for col in m1._cells for c in col] ==\
+            [repr(c) for col in m2._cells for c in col]
+
+    def test_maze_break_walls_long_corridor(self):
+        # a single row deeper than the default recursion limit
+        m = Maze(0, 0, 1, 3000, 1, 1)
+        assert m._break_walls(0, 0)
+        assert not m._cells[0][0].has_right_wall
+        assert not m._cells[-1][-1].has_left_wall
+
     def test_maze_reset_cells_visited(self):
         m = Maze(9, 8, 10, 12, 11, 13)
         m._break_entrance_and_exit()
@@ -250,3 +430,889 @@ class TestMazeClass():
         m._break_walls_r(0, 0)
         m._reset_cells_visited()
         assert m._solve_r(0, 0)
+
+    def test_maze_solve_strategies(self):
+        m = Maze(9, 8, 10, 12, 11, 13)
+        m._break_entrance_and_exit()
+        m._break_walls(0, 0)
+        shortest = m.solve("bfs")
+        assert shortest[0] == (0, 0)
+        assert shortest[-1] == (11, 9)
+        for strategy in ("dfs", "astar", "bidirectional", "corridor"):
+            path = m.solve(strategy)
+            assert path[0] == (0, 0) and path[-1] == (11, 9)
+            for (i, j), (to_i, to_j) in zip(path, path[1:]):
+                assert m._is_not_blocked(i, j, to_i, to_j)
+        # the backtracker carves a tree, so every path is the shortest one
+        assert m.solve("astar") == shortest
+        assert m.solve("bidirectional") == shortest
+        assert m.solve("corridor") == shortest
+
+    def test_maze_solve_no_solution(self):
+        m = Maze(9, 8, 10, 12, 11, 13)
+        for strategy in ("bfs", "dfs", "astar", "bidirectional", "corridor"):
+            assert m.solve(strategy) == []
+
+    def test_maze_solve_unknown_strategy(self):
+        m = Maze(9, 8, 10, 12, 11, 13)
+        with pytest.raises(ValueError):
+            m.solve("teleport")
+
+    def test_maze_solve_outside(self):
+        m = Maze(9, 8, 10, 12, 11, 13, render=False)
+        m._break_walls(0, 0)
+        for strategy in ("bfs", "dfs", "astar", "bidirectional", "corridor"):
+            for start, goal in (((12, 0), None), ((-1, 0), None),
+                                ((0, 0), (0, 10)), ((0, 0), (5, -1))):
+                with pytest.raises(ValueError):
+                    m.solve(strategy, start, goal)
+
+    def test_maze_solve_large(self):
+        # deeper than the default recursion limit
+        m = Maze(0, 0, 1, 3000, 1, 1)
+        m._break_walls(0, 0)
+        assert len(m.solve("dfs")) == 3000
+
+    def test_maze_packed_backend(self):
+        m1 = Maze(9, 8, 10, 12, 11, 13, seed=7)
+        m1._break_entrance_and_exit()
+        m1._break_walls(0, 0)
+        m2 = Maze(9, 8, 10, 12, 11, 13, backend="packed", seed=7)
+        m2._break_entrance_and_exit()
+        m2._break_walls(0, 0)
+        for i in range(12):
+            for j in range(10):
+                assert m1._cells.walls(i, j) == m2._cells.walls(i, j)
+        assert m2.solve("bfs") == m1.solve("bfs")
+        assert m2._draw_start_line()
+        assert m2._draw_end_line()
+
+    def test_maze_unknown_backend(self):
+        with pytest.raises(ValueError):
+            Maze(9, 8, 10, 12, 11, 13, backend="quantum")
+
+    def test_maze_headless(self):
+        m = Maze(9, 8, 10, 12, 11, 13, render=False)
+        m._break_entrance_and_exit()
+        m._break_walls(0, 0)
+        for cell_col in m._cells:
+            for cell in cell_col:
+                assert not hasattr(cell, "left_line")
+                assert cell.get_center() == (None, None)
+        assert m.solve("dfs", draw=True)
+        assert m._draw_start_line()
+        assert m._draw_end_line()
+
+    def test_maze_cell_geometry(self):
+        m = Maze(9, 8, 10, 12, 11, 13)
+        for i, cell_col in enumerate(m._cells):
+            for j, cell in enumerate(cell_col):
+                assert m.cell_geometry(i, j) == (
+                    cell._x1, cell._y1, cell._x2, cell._y2)
+                assert m.cell_center(i, j) == cell.get_center()
+
+    def test_maze_headless_packed_large(self):
+        m = Maze(0, 0, 300, 300, 1, 1, backend="packed", render=False)
+        m._break_entrance_and_exit()
+        assert m._break_walls(0, 0)
+        assert m.solve("bfs")[-1] == (299, 299)
+
+    def test_maze_canvas_items(self):
+        for backend in ("cells", "packed"):
+            win = FakeWindow()
+            m = Maze(9, 8, 5, 6, 11, 13, win, backend)
+            m._break_entrance_and_exit()
+            m._break_walls(0, 0)
+            assert len(win.items) == 4 * 5 * 6
+
+    def test_maze_iter_break_walls(self):
+        m = Maze(9, 8, 10, 12, 11, 13, render=False)
+        events = list(m.iter_break_walls(0, 0))
+        assert m._cells[-1][-1].visited
+        for kind, i, j, to_i, to_j in events:
+            assert kind == "carve"
+            assert abs(i - to_i) + abs(j - to_j) == 1
+            assert m._is_not_blocked(i, j, to_i, to_j)
+
+    def test_maze_iter_break_walls_matches_break_walls(self):
+        m1 = Maze(9, 8, 10, 12, 11, 13, seed=3)
+        m1._break_walls(0, 0)
+        m2 = Maze(9, 8, 10, 12, 11, 13, seed=3)
+        for _ in m2.iter_break_walls(0, 0):
+            pass
+        assert [repr(c) for col in m1._cells for c in col] ==\
+            [repr(c) for col in m2._cells for c in col]
+
+    def test_maze_iter_solve(self):
+        m = Maze(9, 8, 10, 12, 11, 13, render=False)
+        m._break_walls(0, 0)
+        for strategy in ("bfs", "dfs", "astar", "bidirectional", "corridor"):
+            events = list(m.iter_solve(strategy))
+            assert events[-1] == ("path", m.solve(strategy))
+            moves = [e for e in events if e[0] == "move"]
+            forward = [e[1:3] for e in moves if not e[3]]
+            undone = [e[2:0:-1] for e in moves if e[3]]
+            # every move not undone is a step of the solution path
+            path = events[-1][1]
+            assert [s for s in forward if s not in undone] ==\
+                list(zip(path, path[1:]))
+
+    def test_maze_iter_solve_unknown_strategy(self):
+        m = Maze(9, 8, 10, 12, 11, 13)
+        with pytest.raises(ValueError):
+            m.iter_solve("teleport")
+
+
+class TestGenerators():
+
+    @pytest.mark.parametrize("algorithm", sorted(set(ALGORITHMS) - {
+        "backtracker"}))
+    def test_generator_perfect_maze(self, algorithm):
+        for num_rows, num_cols in ((10, 12), (1, 7), (7, 1), (1, 1)):
+            m = Maze(9, 8, num_rows, num_cols, 11, 13, render=False)
+            events = list(m.iter_generate(algorithm))
+            assert m.algorithm == algorithm
+            # a spanning tree of the grid reaching every Cell
+            assert len(events) == num_rows * num_cols - 1
+            for i in range(num_cols):
+                for j in range(num_rows):
+                    assert m.solve("bfs", goal=(i, j))
+
+    def test_generator_seed(self):
+        for algorithm in ALGORITHMS:
+            m1 = Maze(9, 8, 10, 12, 11, 13, render=False, seed=21)
+            m1.generate(algorithm)
+            random.seed(0)
+            m2 = Maze(9, 8, 10, 12, 11, 13, render=False, seed=21)
+            # the global random module doesn't affect the Maze
+            random.random()
+            m2.generate(algorithm)
+            assert m2.seed == 21
+            assert [m1._cells.row_walls(j) for j in range(10)] ==\
+                [m2._cells.row_walls(j) for j in range(10)]
+
+    def test_generator_rng(self):
+        m1 = Maze(9, 8, 10, 12, 11, 13, render=False,
+                  rng=random.Random(22))
+        m1.generate("wilson")
+        m2 = Maze(9, 8, 10, 12, 11, 13, render=False, seed=22)
+        m2.generate("wilson")
+        assert m1.seed is None
+        assert [m1._cells.row_walls(j) for j in range(10)] ==\
+            [m2._cells.row_walls(j) for j in range(10)]
+
+    def test_generator_backtracker(self):
+        m1 = Maze(9, 8, 10, 12, 11, 13, seed=11)
+        m1._break_walls(0, 0)
+        m2 = Maze(9, 8, 10, 12, 11, 13, seed=11)
+        m2.generate()
+        assert m2.algorithm == "backtracker"
+        assert [repr(c) for col in m1._cells for c in col] ==\
+            [repr(c) for col in m2._cells for c in col]
+
+    def test_generator_passed_rng(self):
+        for algorithm, generator in ALGORITHMS.items():
+            m1 = Maze(9, 8, 10, 12, 11, 13, render=False, seed=23)
+            m1.generate(algorithm)
+            m2 = Maze(9, 8, 10, 12, 11, 13, render=False, seed=0)
+            for _ in generator(m2, random.Random(23)):
+                pass
+            assert [m1._cells.row_walls(j) for j in range(10)] ==\
+                [m2._cells.row_walls(j) for j in range(10)]
+
+    def test_generator_unknown_algorithm(self):
+        m = Maze(9, 8, 10, 12, 11, 13)
+        with pytest.raises(ValueError):
+            m.generate("teleport")
+
+    def test_eller_rows(self):
+        rows = list(eller_rows(20, 30))
+        assert len(rows) == 30
+        # every row carves down at-least once, and the last row never does
+        assert all(any(down) for _, down in rows[:-1])
+        assert not any(rows[-1][1])
+        assert sum(sum(right) + sum(down) for right, down in rows) ==\
+            20 * 30 - 1
+
+
+class TestStream():
+
+    @pytest.mark.parametrize("algorithm", stream.ROW_ALGORITHMS)
+    def test_stream_iter_rows(self, algorithm):
+        rows = [bytes(row) for row in stream.iter_rows(
+            12, 10, algorithm, random.Random(5))]
+        assert len(rows) == 10
+        assert all(len(row) == 12 for row in rows)
+        assert not rows[0][0] & TOP and not rows[-1][-1] & BOTTOM
+        passages = 0
+        for j, row in enumerate(rows):
+            assert row[0] & LEFT and row[-1] & RIGHT
+            for i in range(11):
+                assert bool(row[i] & RIGHT) == bool(row[i + 1] & LEFT)
+                passages += not row[i] & RIGHT
+            if j < 9:
+                for i in range(12):
+                    assert bool(row[i] & BOTTOM) ==\
+                        bool(rows[j + 1][i] & TOP)
+                    passages += not row[i] & BOTTOM
+        # a perfect maze over the whole grid
+        assert passages == 12 * 10 - 1
+
+    def test_stream_iter_rows_seed(self):
+        assert list(stream.iter_rows(8, 8, "eller", random.Random(1))) ==\
+            list(stream.iter_rows(8, 8, "eller", random.Random(1)))
+
+    def test_stream_unknown_algorithm(self):
+        with pytest.raises(ValueError):
+            list(stream.iter_rows(8, 8, "kruskal"))
+
+    def test_stream_write_text(self):
+        rows = [bytearray([LEFT | BOTTOM, RIGHT | TOP])]
+        out = io.StringIO()
+        assert stream.write_text(rows, out) == 1
+        assert out.getvalue() == "+  +--+\n|     |\n+--+  +\n"
+
+
+class TestMazeFile():
+
+    def test_maze_file_round_trip(self, tmp_path):
+        for backend in ("cells", "packed"):
+            m = Maze(9, 8, 10, 13, 11, 13, backend=backend, render=False)
+            m._break_entrance_and_exit()
+            m.generate("wilson")
+            # inconsistent walls are preserved as well
+            m._cells[4][4].has_left_wall = False
+            m.seed = 1234
+            mazefile.save(m, tmp_path / "maze")
+            loaded = mazefile.load(tmp_path / "maze")
+            assert (loaded.num_rows, loaded.num_cols) == (10, 13)
+            assert loaded.seed == 1234
+            assert loaded.algorithm == "wilson"
+            for i in range(13):
+                for j in range(10):
+                    assert loaded._cells.walls(i, j) == m._cells.walls(i, j)
+                    assert repr(loaded._cells[i][j]).split()[-4:] ==\
+                        repr(m._cells[i][j]).split()[-4:]
+            assert loaded.solve("bfs") == m.solve("bfs")
+
+    def test_maze_file_size(self, tmp_path):
+        m = Maze(0, 0, 10, 13, 1, 1, render=False)
+        mazefile.save(m, tmp_path / "maze")
+        assert (tmp_path / "maze").stat().st_size ==\
+            mazefile.HEADER.size + 10 * 7
+
+    def test_maze_file_load_copy_on_write(self, tmp_path):
+        m = Maze(0, 0, 3, 3, 1, 1, render=False)
+        mazefile.save(m, tmp_path / "maze")
+        loaded = mazefile.load(tmp_path / "maze")
+        loaded._break_entrance_and_exit()
+        loaded.generate("kruskal")
+        assert mazefile.load(tmp_path / "maze")._cells.walls(0, 0) ==\
+            ALL_WALLS
+
+    def test_maze_file_stream_rows(self, tmp_path):
+        rows = list(stream.iter_rows(7, 5, "sidewinder", random.Random(2)))
+        with open(tmp_path / "maze", "wb") as out:
+            out.write(mazefile.pack_header(7, 5, 2, "sidewinder"))
+            assert mazefile.write_rows(rows, out) == 5
+        loaded = mazefile.load(tmp_path / "maze")
+        assert loaded.seed == 2
+        for j, row in enumerate(rows):
+            assert loaded._cells.row_walls(j) == bytes(row)
+        assert loaded.solve("bfs")[-1] == (6, 4)
+
+    def test_maze_file_invalid(self, tmp_path):
+        (tmp_path / "maze").write_bytes(b"not a maze")
+        with pytest.raises(ValueError):
+            mazefile.load(tmp_path / "maze")
+        with open(tmp_path / "maze", "wb") as out:
+            out.write(mazefile.pack_header(7, 5))
+        with pytest.raises(ValueError):
+            mazefile.load(tmp_path / "maze")
+
+    def test_maze_file_seed_range(self, tmp_path):
+        m = Maze(0, 0, 3, 4, 1, 1, render=False, seed=mazefile.SEED_MIN)
+        mazefile.save(m, tmp_path / "maze")
+        assert mazefile.load(tmp_path / "maze").seed == mazefile.SEED_MIN
+        m.seed = mazefile.SEED_MAX + 1
+        with pytest.raises(ValueError):
+            mazefile.save(m, tmp_path / "too-big")
+        assert not (tmp_path / "too-big").exists()
+        with pytest.raises(ValueError):
+            mazefile.pack_header(4, 3, 10 ** 20)
+
+    def test_maze_file_solve_reads_rows_lazily(self, tmp_path):
+        m = Maze(0, 0, 9, 13, 1, 1, backend="packed", render=False, seed=8)
+        m._break_entrance_and_exit()
+        m.generate("kruskal")
+        mazefile.save(m, tmp_path / "maze")
+        loaded = mazefile.load(tmp_path / "maze")
+        for j in range(9):
+            assert loaded._cells.row_walls(j) == m._cells.row_walls(j)
+        for strategy in ("bfs", "dfs", "astar", "bidirectional"):
+            assert loaded.solve(strategy) == m.solve(strategy)
+            assert loaded.solve(strategy, (3, 4), (7, 2)) ==\
+                m.solve(strategy, (3, 4), (7, 2))
+        # solving never built the passages index of the whole Maze
+        assert loaded._passages_index is None
+        assert loaded.solve("corridor") == m.solve("bfs")
+        assert loaded._passages() == m._passages()
+
+    def test_nibble_grid(self):
+        g = NibbleGrid(bytearray([0xff] * 6), 2, 3, 2)
+        g.break_wall(1, 0, TOP)
+        g.break_wall(2, 1, LEFT)
+        assert g.walls(1, 0) == LEFT | RIGHT | BOTTOM
+        assert g.walls(0, 0) == ALL_WALLS
+        assert g.walls(2, 1) == TOP | RIGHT | BOTTOM
+        assert g._buffer == bytearray([0xff, 0xff, 0xdf, 0xff, 0xff, 0xfe])
+        g[0][1].visited = True
+        assert g.is_visited(0, 1)
+        g.reset_visited()
+        assert not g.is_visited(0, 1)
+
+
+class TestMazePassages():
+
+    def test_maze_passages(self):
+        for backend in ("cells", "packed"):
+            m = Maze(9, 8, 10, 12, 11, 13, backend=backend, render=False)
+            m._break_entrance_and_exit()
+            m.generate("prim")
+            passages = m._passages()
+            for i in range(12):
+                for j in range(10):
+                    p = passages[j * 12 + i]
+                    assert bool(p & LEFT) ==\
+                        (i > 0 and m._is_not_blocked(i, j, i - 1, j))
+                    assert bool(p & TOP) ==\
+                        (j > 0 and m._is_not_blocked(i, j, i, j - 1))
+                    assert bool(p & RIGHT) ==\
+                        (i < 11 and m._is_not_blocked(i, j, i + 1, j))
+                    assert bool(p & BOTTOM) ==\
+                        (j < 9 and m._is_not_blocked(i, j, i, j + 1))
+
+    def test_maze_passages_cached(self):
+        m = Maze(9, 8, 10, 12, 11, 13, render=False)
+        assert m._passages() is m._passages()
+
+    def test_maze_passages_invalidated(self):
+        for backend in ("cells", "packed"):
+            m = Maze(9, 8, 10, 12, 11, 13, backend=backend, render=False)
+            assert m.solve("bfs") == []
+            # walls changed without going through the Maze
+            for i in range(11):
+                m._cells[i][0].has_right_wall = False
+            for j in range(9):
+                m._cells[11][j].has_bottom_wall = False
+            assert len(m.solve("bfs")) == 12 + 10 - 1
+
+    def test_maze_passages_kept_when_visiting(self):
+        for backend in ("cells", "packed"):
+            m = Maze(9, 8, 10, 12, 11, 13, backend=backend, render=False)
+            m.generate("prim")
+            passages = m._passages()
+            m._cells[3][4].visited = True
+            m._cells[3][4].visited = False
+            assert m._passages() is passages
+        g = NibbleGrid(bytearray([0xff] * 6), 0, 3, 2)
+        g[1][1].visited = True
+        assert g.version == 0
+        g[1][1].has_top_wall = False
+        assert g.version == 1
+
+    def test_maze_passages_per_maze(self):
+        m1 = Maze(9, 8, 10, 12, 11, 13, render=False, seed=1)
+        m1.generate("kruskal")
+        passages = m1._passages()
+        m2 = Maze(9, 8, 2, 2, 11, 13, render=False)
+        m2.generate("kruskal")
+        # walls of another Maze don't invalidate the index
+        assert m1._passages() is passages
+
+
+class TestNumpyGrid():
+
+    def test_numpy_grid_matches_packed_grid(self):
+        pytest.importorskip("numpy")
+        mazes = []
+        for backend in ("packed", "numpy"):
+            m = Maze(9, 8, 10, 12, 11, 13, backend=backend, render=False,
+                     seed=4)
+            m._break_entrance_and_exit()
+            m.generate("kruskal")
+            mazes.append(m)
+        packed, numpy = mazes
+        assert numpy._cells.array.shape == (10, 12)
+        for j in range(10):
+            assert numpy._cells.row_walls(j) == packed._cells.row_walls(j)
+        assert numpy._passages() == packed._passages()
+        assert numpy.solve("bfs") == packed.solve("bfs")
+
+    def test_numpy_grid_reset_visited(self):
+        pytest.importorskip("numpy")
+        m = Maze(9, 8, 10, 12, 11, 13, backend="numpy", render=False)
+        m._cells[3][4].visited = True
+        m._cells.break_wall(3, 4, TOP)
+        m._reset_cells_visited()
+        assert not m._cells.is_visited(3, 4)
+        assert m._cells.walls(3, 4) == LEFT | RIGHT | BOTTOM
+
+    def test_maze_degrees_and_dead_ends(self):
+        pytest.importorskip("numpy")
+        counts = []
+        for backend in ("cells", "packed", "numpy"):
+            m = Maze(9, 8, 10, 12, 11, 13, backend=backend, render=False,
+                     seed=6)
+            m.generate("wilson")
+            degrees = m.degrees()
+            assert [list(col) for col in degrees] ==\
+                [[len(m._moves()[m._passages()[j * 12 + i]])
+                  for j in range(10)] for i in range(12)]
+            assert m.count_dead_ends() ==\
+                sum(d == 1 for col in degrees for d in col)
+            counts.append(m.count_dead_ends())
+        assert counts[0] == counts[1] == counts[2]
+
+
+class TestDistanceField():
+
+    def test_distance_field(self):
+        m = Maze(9, 8, 10, 12, 11, 13, render=False, seed=8)
+        m.generate("prim")
+        distances = m.distance_field((3, 4))
+        assert len(distances) == 12
+        assert len(distances[0]) == 10
+        for i in range(12):
+            for j in range(10):
+                assert distances[i][j] ==\
+                    len(m.solve("bfs", (3, 4), (i, j))) - 1
+
+    def test_distance_field_unreachable(self):
+        m = Maze(9, 8, 10, 12, 11, 13, render=False)
+        m._break_wall_between(0, 0, 1, 0)
+        distances = m.distance_field()
+        assert distances[0][0] == 0
+        assert distances[1][0] == 1
+        assert sum(d == -1 for col in distances for d in col) == 12 * 10 - 2
+
+    def test_distance_field_outside(self):
+        m = Maze(9, 8, 10, 12, 11, 13, render=False)
+        with pytest.raises(ValueError):
+            m.distance_field((12, 0))
+
+    def test_distance_field_numpy(self):
+        pytest.importorskip("numpy")
+        for algorithm, size in (("binary-tree", 150), ("backtracker", 30)):
+            fields = []
+            for backend in ("packed", "numpy"):
+                m = Maze(9, 8, size, size + 3, 1, 1, backend=backend,
+                         render=False, seed=9)
+                m.generate(algorithm)
+                # a loop, so some Cells are reached from two Cells at once
+                m._break_wall_between(5, 5, 6, 5)
+                m._break_wall_between(5, 6, 6, 6)
+                m._break_wall_between(5, 5, 5, 6)
+                m._break_wall_between(6, 5, 6, 6)
+                fields.append(m.distance_field((size // 2, size // 3)))
+            packed, numpy = fields
+            assert numpy.shape == (size + 3, size)
+            assert [list(col) for col in numpy] == packed
+
+
+class TestJunctionGraph():
+
+    def test_junction_graph(self):
+        m = Maze(0, 0, 15, 20, 1, 1, render=False, seed=2)
+        m.generate("backtracker")
+        passages = m._passages()
+        graph = JunctionGraph(passages, m._moves(), [0])
+        degrees = [bin(p).count("1") for p in passages]
+        assert sorted(graph.edges) == [0] + [
+            index for index, degree in enumerate(degrees)
+            if degree in (1, 3, 4) and index != 0]
+        for node, edges in graph.edges.items():
+            assert len(edges) == degrees[node]
+            for to_node, length, via in edges:
+                path = graph.expand([node, to_node])
+                assert path[1] == via and len(path) == length + 1
+                assert all(degrees[index] == 2 for index in path[1:-1])
+                assert (node, length) in graph.neighbours(to_node)
+
+    def test_junction_graph_extra_nodes(self):
+        m = Maze(0, 0, 1, 10, 1, 1, render=False)
+        m._break_walls(0, 0)
+        graph = JunctionGraph(m._passages(), m._moves(), [0, 4, 9])
+        assert graph.neighbours(4) == [(0, 4), (9, 5)]
+        assert graph.expand([0, 4, 9]) == list(range(10))
+        assert graph.expand([]) == []
+
+    def test_junction_graph_spliced(self):
+        m = Maze(0, 0, 1, 10, 1, 1, render=False)
+        m._break_walls(0, 0)
+        graph = JunctionGraph(m._passages(), m._moves(), [0, 9])
+        spliced = graph.spliced([6, 3, 0])
+        assert sorted(graph.edges) == [0, 9]
+        assert graph.neighbours(0) == [(9, 9)]
+        assert sorted(spliced.edges) == [0, 3, 6, 9]
+        # 6 was spliced before 3, so keeps its edge to 0 going through 3
+        assert sorted(spliced.neighbours(6)) == [(0, 6), (3, 3), (9, 3)]
+        assert sorted(spliced.neighbours(3)) == [(0, 3), (6, 3)]
+        assert sorted(spliced.neighbours(0)) == [(3, 3), (6, 6), (9, 9)]
+        assert spliced.expand([0, 3, 6]) == list(range(7))
+        assert spliced.expand([9, 6, 3]) == list(range(9, 2, -1))
+        search = solvers.bidirectional_dijkstra(spliced.neighbours, 3, 6)
+        assert solvers.solve(spliced.expanded(search)) == [3, 4, 5, 6]
+
+    def test_junction_graph_export(self):
+        m = Maze(0, 0, 8, 9, 1, 1, render=False, seed=4)
+        m.generate("prim")
+        graph = JunctionGraph(m._passages(), m._moves(), [0, 71])
+        exported = json.loads(json.dumps(graph.to_dict()))
+        assert exported["nodes"] == sorted(graph.edges)
+        assert len(exported["edges"]) * 2 == sum(
+            len(edges) for edges in graph.edges.values())
+        # a perfect maze is a tree, so is its junction graph
+        assert len(exported["edges"]) == len(exported["nodes"]) - 1
+        for node, to_node, length in exported["edges"]:
+            assert node < to_node
+            assert (to_node, length) in graph.neighbours(node)
+
+    def test_maze_junction_graph_cached(self):
+        m = Maze(0, 0, 10, 12, 1, 1, render=False, seed=3)
+        m.generate("kruskal")
+        graph = m.junction_graph()
+        nodes = sorted(graph.edges)
+        assert m.junction_graph() is graph
+        assert 0 in graph.edges and 119 in graph.edges
+        assert m.solve("corridor", (3, 4), (7, 2)) ==\
+            m.solve("bfs", (3, 4), (7, 2))
+        assert m.junction_graph() is graph
+        assert sorted(graph.edges) == nodes
+        m._break_wall_between(0, 0, 1, 0)
+        m._break_wall_between(0, 0, 0, 1)
+        assert m.junction_graph() is not graph
+
+    def test_bidirectional_dijkstra(self):
+        edges = {
+            "a": [("b", 1), ("c", 5)],
+            "b": [("a", 1), ("c", 1), ("d", 7)],
+            "c": [("a", 5), ("b", 1), ("d", 1)],
+            "d": [("b", 7), ("c", 1)],
+            "e": [],
+        }.__getitem__
+        search = solvers.bidirectional_dijkstra(edges, "a", "d")
+        assert solvers.solve(search) == ["a", "b", "c", "d"]
+        search = solvers.bidirectional_dijkstra(edges, "d", "a")
+        assert solvers.solve(search) == ["d", "c", "b", "a"]
+        assert solvers.solve(
+            solvers.bidirectional_dijkstra(edges, "a", "e")) == []
+        assert solvers.solve(
+            solvers.bidirectional_dijkstra(edges, "a", "a")) == ["a"]
+
+    def test_maze_solve_corridor_with_loops(self):
+        rng = random.Random(5)
+        m = Maze(0, 0, 12, 15, 1, 1, render=False, seed=5)
+        m.generate("kruskal")
+        for _ in range(40):
+            i, j = rng.randrange(14), rng.randrange(12)
+            m._break_wall_between(i, j, i + 1, j)
+        for _ in range(20):
+            start = (rng.randrange(15), rng.randrange(12))
+            goal = (rng.randrange(15), rng.randrange(12))
+            path = m.solve("corridor", start, goal)
+            assert len(path) == len(m.solve("bfs", start, goal))
+            assert path[0] == start and path[-1] == goal
+            for (i, j), (to_i, to_j) in zip(path, path[1:]):
+                assert abs(i - to_i) + abs(j - to_j) == 1
+                assert m._is_not_blocked(i, j, to_i, to_j)
+
+    def test_maze_solve_corridor_expands_junctions(self):
+        stats = MazeStats()
+        m = Maze(0, 0, 40, 40, 1, 1, render=False, seed=1, stats=stats)
+        m._break_entrance_and_exit()
+        m.generate("backtracker")
+        path = m.solve("bidirectional")
+        expanded = stats.counts["nodes_expanded"]
+        stats.reset()
+        assert m.solve("corridor") == path
+        assert stats.counts["nodes_expanded"] * 3 < expanded
+
+
+class TestLCAIndex():
+
+    def test_lca_index(self):
+        # a comb: row 0 is a corridor, and every column goes down from it
+        m = Maze(0, 0, 6, 5, 1, 1, render=False)
+        for i in range(4):
+            m._break_wall_between(i, 0, i + 1, 0)
+        for i in range(5):
+            for j in range(5):
+                m._break_wall_between(i, j, i, j + 1)
+        index = LCAIndex(m._passages(), m._moves())
+        assert list(index.depths[:5]) == [0, 1, 2, 3, 4]
+        assert index.lca(5 * 5 + 1, 5 * 2 + 3) == 1
+        assert index.lca(5 * 5 + 3, 5 * 2 + 3) == 5 * 2 + 3
+        assert index.lca(7, 7) == 7
+        assert index.distance(5 * 5 + 1, 5 * 2 + 3) == 5 + 2 + 2
+        assert index.path(5 * 2 + 1, 3) == [11, 6, 1, 2, 3]
+        assert index.path(3, 3) == [3]
+
+    @pytest.mark.parametrize("algorithm", sorted(ALGORITHMS))
+    def test_maze_path_and_distance(self, algorithm):
+        m = Maze(0, 0, 13, 17, 1, 1, render=False, seed=6)
+        m.generate(algorithm)
+        rng = random.Random(6)
+        distances = m.distance_field()
+        for _ in range(50):
+            a = (rng.randrange(17), rng.randrange(13))
+            b = (rng.randrange(17), rng.randrange(13))
+            if distances[a[0]][a[1]] < 0 or distances[b[0]][b[1]] < 0:
+                with pytest.raises(ValueError):
+                    m.distance(a, b)
+                continue
+            assert m.path(a, b) == m.solve("bfs", a, b)
+            assert m.distance(a, b) == len(m.path(a, b)) - 1
+        assert m.distance((0, 0), (16, 12)) == distances[16][12]
+
+    def test_maze_path_cached(self):
+        m = Maze(0, 0, 10, 10, 1, 1, render=False, seed=1)
+        m.generate("wilson")
+        index = m._lca()
+        assert m.distance((0, 0), (9, 9)) == len(m.path((9, 9), (0, 0))) - 1
+        assert m._lca() is index
+        m._break_entrance_and_exit()
+        assert m._lca() is not index
+
+    def test_maze_path_errors(self):
+        m = Maze(0, 0, 4, 4, 1, 1, render=False)
+        m.generate("kruskal")
+        with pytest.raises(ValueError):
+            m.path((0, 0), (4, 0))
+        closed = Maze(0, 0, 4, 4, 1, 1, render=False)
+        closed._break_wall_between(0, 0, 1, 0)
+        with pytest.raises(ValueError, match=r"Cell \(2, 3\) can't be"):
+            closed.path((0, 0), (2, 3))
+        with pytest.raises(ValueError, match=r"Cell \(3, 1\) can't be"):
+            closed.distance((3, 1), (1, 0))
+        with pytest.raises(ValueError):
+            m.distance((-1, 0), (0, 0))
+        # a loop
+        for i, j, to_i, to_j in ((0, 0, 1, 0), (1, 0, 1, 1), (1, 1, 0, 1),
+                                 (0, 1, 0, 0)):
+            m._break_wall_between(i, j, to_i, to_j)
+        with pytest.raises(ValueError):
+            m.distance((0, 0), (3, 3))
+
+
+class TestBatch():
+
+    def test_batch_job_seeds(self):
+        assert batch.job_seeds(5, 10) == batch.job_seeds(5, 10)
+        assert batch.job_seeds(5, 10)[:4] == batch.job_seeds(5, 4)
+        assert batch.job_seeds(5, 10) != batch.job_seeds(6, 10)
+
+    def test_batch_run(self, tmp_path):
+        entries = list(batch.run(5, 12, 10, tmp_path, "kruskal", seed=3,
+                                 workers=1, solve=True))
+        assert [e["index"] for e in entries] == list(range(5))
+        with open(tmp_path / batch.MANIFEST) as manifest:
+            assert [json.loads(line) for line in manifest] == entries
+        for entry in entries:
+            m = mazefile.load(tmp_path / entry["file"])
+            assert (m.num_cols, m.num_rows) == (12, 10)
+            assert (m.seed, m.algorithm) == (entry["seed"], "kruskal")
+            assert len(m.solve("bfs")) == entry["solution_length"] > 0
+
+    def test_batch_run_workers(self, tmp_path):
+        one = list(batch.run(6, 12, 10, tmp_path / "one", seed=3, workers=1))
+        two = list(batch.run(6, 12, 10, tmp_path / "two", seed=3, workers=2))
+        assert one == two
+        for entry in one:
+            assert (tmp_path / "one" / entry["file"]).read_bytes() ==\
+                (tmp_path / "two" / entry["file"]).read_bytes()
+
+
+class TestBench():
+
+    def test_bench_run(self):
+        results = list(bench.run([6, 9], repeat=2))
+        assert [(r["case"], r["size"]) for r in results] ==\
+            [(case, size) for size in (6, 9) for case in bench.CASES]
+        for r in results:
+            assert r["cells"] == r["size"] ** 2
+            assert r["seconds"] > 0
+            assert r["cells_per_sec"] == pytest.approx(
+                r["cells"] * r["ops_per_sec"])
+            assert r["peak_bytes"] > 0
+
+    def test_bench_run_without_memory(self):
+        results = list(bench.run([6], ["solve"], "packed", 1, memory=False))
+        assert len(results) == 1
+        assert results[0]["backend"] == "packed"
+        assert results[0]["peak_bytes"] is None
+
+    def test_bench_import_times(self):
+        results = list(bench.import_times(["maze", "graphics"], repeat=1))
+        assert [r["module"] for r in results] == ["maze", "graphics"]
+        for r in results:
+            assert r["seconds"] >= 0
+            assert r["loaded"] == []
+
+
+class TestMazeStats():
+
+    def test_stats_counters_and_timers(self):
+        stats = MazeStats()
+        stats.count("walls_broken")
+        stats.count("walls_broken", 2)
+        stats.count("frames")
+        with stats.timer("work"):
+            pass
+        with stats.timer("work"):
+            pass
+        assert stats.counts["walls_broken"] == 3
+        assert stats.counts["frames"] == 1
+        assert stats.counts["backtracks"] == 0
+        assert 0 <= stats.timings["work"] <= stats.elapsed()
+        assert "walls_broken: 3" in stats.report()
+        stats.reset()
+        assert stats.as_dict()["counts"]["walls_broken"] == 0
+        assert stats.as_dict()["timings"] == {}
+
+    def test_maze_stats(self):
+        stats = MazeStats()
+        m = Maze(9, 8, 10, 12, 11, 13, FakeWindow(), seed=5, stats=stats)
+        assert stats.counts["cells_drawn"] == 12 * 10
+        carved = sum(1 for _ in m.iter_generate("kruskal"))
+        assert stats.counts["walls_broken"] == carved == 12 * 10 - 1
+        events = list(m.iter_solve("dfs"))
+        assert stats.counts["backtracks"] ==\
+            sum(1 for e in events if e[0] == "move" and e[3])
+        assert stats.counts["backtracks"] > 0
+        assert 0 < stats.counts["nodes_expanded"] <= 12 * 10
+        m.solve("dfs", draw=True)
+        assert stats.timings["animate"] > 0
+
+    def test_maze_without_stats(self):
+        m = Maze(9, 8, 10, 12, 11, 13, FakeWindow(), seed=5)
+        m.generate("prim")
+        assert m.stats is None
+        assert len(m.solve("dfs", draw=True)) > 0
+
+
+class TestRender():
+
+    def test_rasterize_walls(self):
+        m = Maze(9, 8, 10, 12, 11, 13, render=False, seed=12)
+        m._break_entrance_and_exit()
+        m.generate("wilson")
+        raster = render.rasterize(m)
+        assert (raster.width, raster.height) == (2 * 9 + 12 * 11,
+                                                 2 * 8 + 10 * 13)
+        for i in range(12):
+            for j in range(10):
+                x1, y1, x2, y2 = m.cell_geometry(i, j)
+                x, y = m.cell_center(i, j)
+                x, y = int(x), int(y)
+                assert raster.pixel(x, y) == render.BACKGROUND
+                left_wall = i == 0 or not m._is_not_blocked(i, j, i - 1, j)
+                top_wall = m._cells[i][j].has_top_wall if j == 0 else\
+                    not m._is_not_blocked(i, j, i, j - 1)
+                assert (raster.pixel(x1, y) == render.WALL) == left_wall
+                assert (raster.pixel(x, y1) == render.WALL) == top_wall
+        # the entrance and exit are open
+        assert raster.pixel(9 + 5, 8) == render.BACKGROUND
+        assert raster.pixel(9 + 11 * 11 + 5, 8 + 10 * 13) == render.BACKGROUND
+
+    def test_rasterize_path(self):
+        m = Maze(9, 8, 10, 12, 11, 13, render=False, seed=12)
+        m._break_entrance_and_exit()
+        m.generate("wilson")
+        path = m.solve("bfs")
+        raster = render.rasterize(m, path, cell_size=(6, 6), margin=(3, 3))
+        assert (raster.width, raster.height) == (6 + 12 * 6, 6 + 10 * 6)
+        for i, j in path:
+            x, y = m.cell_center(i, j, (3, 3), (6, 6))
+            assert raster.pixel(int(x), int(y)) == render.PATH
+        # the entrance line goes up to the top of the maze
+        assert raster.pixel(6, 3) == render.PATH
+        assert raster.pixels.count(render.PATH) > len(path) * 6
+
+    def test_raster_images(self, tmp_path):
+        raster = render.Raster(5, 3)
+        raster.fill(1, 1, 3, 9, render.WALL)
+        assert raster.pixels == bytearray([0, 0, 0, 0, 0,
+                                           0, 1, 1, 0, 0,
+                                           0, 1, 1, 0, 0])
+        ppm = raster.to_ppm()
+        assert ppm.startswith(b"P6 5 3 255\n")
+        assert ppm[-9:] == bytes([0, 0, 0, 255, 255, 255, 255, 255, 255])
+        png = raster.to_png()
+        assert png.startswith(b"\x89PNG\r\n\x1a\n")
+        idat = png.index(b"IDAT")
+        length = int.from_bytes(png[idat - 4:idat], "big")
+        assert zlib.decompress(png[idat + 4:idat + 4 + length]) ==\
+            b"\0\0\0\0\0\0" b"\0\0\1\1\0\0" b"\0\0\1\1\0\0"
+        raster.save(tmp_path / "maze.ppm")
+        raster.save(tmp_path / "maze.png")
+        assert (tmp_path / "maze.ppm").read_bytes() == ppm
+        assert (tmp_path / "maze.png").read_bytes() == png
+
+    def test_to_svg_merges_walls(self):
+        m = Maze(9, 8, 10, 12, 11, 13, render=False, seed=13)
+        m._break_entrance_and_exit()
+        m.generate("kruskal")
+        svg = render.to_svg(m, m.solve("bfs"))
+        assert svg.startswith("<svg ")
+        assert svg.count("<path ") == 1
+        d = svg.split(' d="')[1].split('"')[0]
+        segments = [tuple(float(v) for v in s.replace("H", " ").replace(
+            "V", " ").split()) for s in d.split("M")[1:]]
+        horizontal, vertical = set(), set()
+        for segment, kind in zip(segments, d.split("M")[1:]):
+            if "H" in kind:
+                x1, y, x2 = segment
+                cells = range(int(x1 - 9) // 11, int(x2 - 9) // 11)
+                edges = {(i, int(y - 8) // 13) for i in cells}
+                # every wall is drawn exactly once
+                assert not edges & horizontal
+                horizontal |= edges
+            else:
+                x, y1, y2 = segment
+                cells = range(int(y1 - 8) // 13, int(y2 - 8) // 13)
+                edges = {(int(x - 9) // 11, j) for j in cells}
+                assert not edges & vertical
+                vertical |= edges
+        assert horizontal == {
+            (i, j) for i in range(12) for j in range(11)
+            if (m._cells[i][j].has_top_wall if j == 0 else
+                m._cells[i][j - 1].has_bottom_wall if j == 10 else
+                not m._is_not_blocked(i, j, i, j - 1))}
+        assert vertical == {
+            (i, j) for i in range(13) for j in range(10)
+            if (m._cells[i][j].has_left_wall if i == 0 else
+                m._cells[i - 1][j].has_right_wall if i == 12 else
+                not m._is_not_blocked(i, j, i - 1, j))}
+        # walls along the same line are merged into a single segment
+        ends = [(s[1], s[2]) for s, kind in zip(segments, d.split("M")[1:])
+                if "H" in kind]
+        starts = [(s[1], s[0]) for s, kind in zip(segments, d.split("M")[1:])
+                  if "H" in kind]
+        assert not set(ends) & set(starts)
+        assert len(segments) < len(horizontal) + len(vertical)
+        assert "<polyline " in svg
+
+
+class TestMazeSharedGeometry():
+
+    def test_maze_cells_share_walls(self):
+        m = Maze(9, 8, 10, 12, 11, 13)
+        for i in range(11):
+            for j in range(9):
+                assert m._cells[i][j].right_line is\
+                    m._cells[i + 1][j].left_line
+                assert m._cells[i][j].bottom_line is\
+                    m._cells[i][j + 1].top_line
+        assert sum(map(len, m._shared_geometry._points.values())) == 13 * 11
+        assert len(m._shared_geometry._lines) == 12 * 11 + 13 * 10